@@ -0,0 +1,26 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_application'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VolunteerSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=200)),
+                ('volunteer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_postings', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('skill', 'volunteer')},
+            },
+        ),
+    ]
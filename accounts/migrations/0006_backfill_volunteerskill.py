@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+def backfill_skill_index(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    VolunteerSkill = apps.get_model('accounts', 'VolunteerSkill')
+
+    postings = []
+    for user in User.objects.filter(is_volunteer=True).only('id', 'skills').iterator(chunk_size=2000):
+        if not isinstance(user.skills, list):
+            continue
+        skills = {str(skill) for skill in user.skills if skill not in (None, '')}
+        postings.extend(VolunteerSkill(skill=skill, volunteer_id=user.id) for skill in skills)
+        if len(postings) >= 2000:
+            VolunteerSkill.objects.bulk_create(postings, ignore_conflicts=True)
+            postings = []
+    if postings:
+        VolunteerSkill.objects.bulk_create(postings, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_volunteerskill'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_skill_index, migrations.RunPython.noop),
+    ]
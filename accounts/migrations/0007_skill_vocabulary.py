@@ -0,0 +1,56 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+from accounts.vocabulary import normalize_skills
+
+
+def normalize_user_skills(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    VolunteerSkill = apps.get_model('accounts', 'VolunteerSkill')
+
+    changed = []
+    for user in User.objects.exclude(skills=None).only('id', 'skills').iterator(chunk_size=2000):
+        skills = normalize_skills(user.skills)
+        if skills != user.skills:
+            user.skills = skills
+            changed.append(user)
+        if len(changed) >= 2000:
+            User.objects.bulk_update(changed, ['skills'])
+            changed = []
+    if changed:
+        User.objects.bulk_update(changed, ['skills'])
+
+    # Re-key the skill postings on the canonical strings
+    VolunteerSkill.objects.all().delete()
+    postings = []
+    for user in User.objects.filter(is_volunteer=True).only('id', 'skills').iterator(chunk_size=2000):
+        if not isinstance(user.skills, list):
+            continue
+        postings.extend(VolunteerSkill(skill=skill, volunteer_id=user.id) for skill in user.skills)
+        if len(postings) >= 2000:
+            VolunteerSkill.objects.bulk_create(postings, ignore_conflicts=True)
+            postings = []
+    if postings:
+        VolunteerSkill.objects.bulk_create(postings, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+    # The user table is large; build its indexes without locking writes
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0006_backfill_volunteerskill'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_user_skills, migrations.RunPython.noop, atomic=True),
+        AddIndexConcurrently(
+            model_name='user',
+            index=GinIndex(fields=['skills'], name='user_skills_gin'),
+        ),
+        AddIndexConcurrently(
+            model_name='user',
+            index=GinIndex(fields=['interests'], name='user_interests_gin'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_skill_vocabulary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='prefers_virtual',
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='weekly_hours',
+            field=models.PositiveIntegerField(blank=True, help_text='Hours per week available', null=True),
+        ),
+    ]
@@ -1,8 +1,11 @@
 
+from django.apps import apps
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from .vocabulary import normalize_interests, normalize_skills
 
 class User(AbstractUser):
     is_volunteer = models.BooleanField(default=False)
@@ -11,12 +14,29 @@ class User(AbstractUser):
     address = models.TextField(blank=True)
     skills = models.JSONField(null=True, blank=True)
     interests = models.JSONField(null=True, blank=True)
+    # Matching preferences; None means no preference
+    prefers_virtual = models.BooleanField(null=True, blank=True)
+    weekly_hours = models.PositiveIntegerField(null=True, blank=True, help_text="Hours per week available")
     bio = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Containment / any-key lookups on the canonical skill and interest lists
+            GinIndex(fields=['skills'], name='user_skills_gin'),
+            GinIndex(fields=['interests'], name='user_interests_gin'),
+        ]
+
     def clean(self):
         if self.is_volunteer and self.is_organization:
             raise ValidationError("User cannot be both volunteer and organization")
+
+    def save(self, *args, **kwargs):
+        self.skills = normalize_skills(self.skills)
+        # Interests name opportunity categories; store them as category labels
+        categories = apps.get_model('opportunities', 'Opportunity')._meta.get_field('category').choices
+        self.interests = normalize_interests(self.interests, categories)
+        super().save(*args, **kwargs)
         
 class Message(models.Model):
     sender = models.ForeignKey(User, related_name='sent_messages', on_delete=models.CASCADE)
@@ -48,4 +68,19 @@ class Application(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.volunteer.username}'s application for {self.opportunity.title}"
\ No newline at end of file
+        return f"{self.volunteer.username}'s application for {self.opportunity.title}"
+
+class VolunteerSkill(models.Model):
+    """Inverted index entry: one row per (skill, volunteer) pair.
+
+    Kept in sync with ``User.skills`` by ``accounts.signals`` so matching can
+    read the posting list of a skill instead of scanning every volunteer.
+    """
+    skill = models.CharField(max_length=200)
+    volunteer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='skill_postings')
+
+    class Meta:
+        unique_together = ('skill', 'volunteer')
+
+    def __str__(self):
+        return f"{self.skill} -> {self.volunteer_id}"
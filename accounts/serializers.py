@@ -11,7 +11,7 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ('id', 'username', 'email', 'password', 
                  'is_volunteer', 'is_organization', 
                  'phone', 'address', 'bio', 'skills', 
-                 'interests')
+                 'interests', 'prefers_virtual', 'weekly_hours')
         extra_kwargs = {'password': {'write_only': True}}
     
     def create(self, validated_data):
@@ -24,7 +24,8 @@ class ProfileSerializer(serializers.ModelSerializer):
     """Serializer for profile updates - excludes sensitive fields"""
     class Meta:
         model = User
-        fields = ('id', 'username', 'email', 'phone', 'address', 'bio', 'skills', 'interests')
+        fields = ('id', 'username', 'email', 'phone', 'address', 'bio', 'skills', 'interests',
+                  'prefers_virtual', 'weekly_hours')
         read_only_fields = ('id',)
 
     
@@ -46,6 +47,7 @@ class ApplicationSerializer(serializers.ModelSerializer):
                   'created_at', 'updated_at', 'volunteer_name', 
                   'volunteer_email', 'opportunity_title', 'organization_name']
         read_only_fields = ['volunteer', 'created_at', 'updated_at']
+        select_related = ('volunteer', 'opportunity__organization')
     
     def get_volunteer_name(self, obj):
         return obj.volunteer.username
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import User
+from .skill_index import sync_volunteer_skills
+
+# Saves that only touch these fields cannot change the skill index
+SKILL_INDEX_FIELDS = {'skills', 'is_volunteer'}
+
+
+@receiver(post_save, sender=User)
+def update_skill_index(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not SKILL_INDEX_FIELDS & set(update_fields):
+        return
+    if created and not instance.is_volunteer:
+        return
+    sync_volunteer_skills(instance)
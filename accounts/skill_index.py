@@ -0,0 +1,42 @@
+from .models import User, VolunteerSkill
+from .vocabulary import normalize_skills
+
+
+def indexed_skills(user):
+    """Return the set of skills that should be indexed for ``user``."""
+    if not user.is_volunteer or not isinstance(user.skills, list):
+        return set()
+    return set(normalize_skills(user.skills))
+
+
+def sync_volunteer_skills(user):
+    """Bring the skill postings of a single user in line with ``user.skills``"""
+    wanted = indexed_skills(user)
+    current = set(
+        VolunteerSkill.objects.filter(volunteer=user).values_list('skill', flat=True)
+    )
+
+    stale = current - wanted
+    if stale:
+        VolunteerSkill.objects.filter(volunteer=user, skill__in=stale).delete()
+
+    missing = wanted - current
+    if missing:
+        VolunteerSkill.objects.bulk_create(
+            [VolunteerSkill(skill=skill, volunteer=user) for skill in missing],
+            ignore_conflicts=True,
+        )
+
+
+def rebuild_skill_index(batch_size=2000):
+    """Rebuild the whole inverted index from ``User.skills``"""
+    VolunteerSkill.objects.all().delete()
+    postings = []
+    volunteers = User.objects.filter(is_volunteer=True).only('id', 'is_volunteer', 'skills')
+    for user in volunteers.iterator(chunk_size=batch_size):
+        postings.extend(VolunteerSkill(skill=skill, volunteer=user) for skill in indexed_skills(user))
+        if len(postings) >= batch_size:
+            VolunteerSkill.objects.bulk_create(postings, ignore_conflicts=True)
+            postings = []
+    if postings:
+        VolunteerSkill.objects.bulk_create(postings, ignore_conflicts=True)
@@ -1,8 +1,12 @@
 import pytest
 from rest_framework import status
 from django.urls import reverse
-from .models import Message
+from datetime import timedelta
+from django.utils import timezone
+from .models import Message, User, Application
+from opportunities.models import Opportunity
 from rest_framework.test import APIClient
+from volunteer_bridge.testing import assert_queries_do_not_grow
 
 @pytest.mark.django_db
 class TestAuthentication:
@@ -47,12 +51,12 @@ class TestMessaging:
         # Test organization can see sent message
         org_response = org_client.get(reverse('message-list'))
         assert org_response.status_code == status.HTTP_200_OK
-        assert len(org_response.data) > 0
+        assert len(org_response.data['results']) > 0
         
         # Test volunteer can see received message
         vol_response = vol_client.get(reverse('message-list'))
         assert vol_response.status_code == status.HTTP_200_OK
-        assert len(vol_response.data) > 0
+        assert len(vol_response.data['results']) > 0
 
     def test_mark_as_read(self, org_client, vol_client, message_data):
         """Test marking a message as read"""
@@ -112,3 +116,25 @@ class TestMessaging:
         }).json()['access']
         client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
         return client
+
+@pytest.mark.django_db
+class TestApplicationQueries:
+    def test_organization_applications_queries_do_not_grow(self):
+        organization = User.objects.create_user(username='apporg', password='testpass123', is_organization=True)
+        opportunity = Opportunity.objects.create(
+            title='Apply here', description='Test', organization=organization, required_skills=[],
+            start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1), location='Remote',
+        )
+        client = APIClient()
+        client.force_authenticate(user=organization)
+
+        def apply():
+            volunteer = User.objects.create_user(
+                username=f'applicant{Application.objects.count()}', password='testpass123', is_volunteer=True
+            )
+            Application.objects.create(volunteer=volunteer, opportunity=opportunity)
+
+        apply()
+        assert_queries_do_not_grow(
+            client, reverse('organization_applications'), lambda: [apply() for _ in range(3)], max_queries=1
+        )
@@ -8,9 +8,10 @@ from rest_framework.decorators import action, api_view, permission_classes, rend
 from rest_framework.renderers import JSONRenderer
 from .models import User, Message, Application
 from django.db.models import Q
-from notifications.utils import create_notification
+from jobs.queue import enqueue
 from .serializers import UserSerializer, ApplicationSerializer
 from opportunities.models import Opportunity
+from volunteer_bridge.query_planning import QueryPlanMixin, plan_queryset
 
 
 @api_view(['GET'])
@@ -87,16 +88,18 @@ class RegisterView(APIView):
             user = serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering = 'id'
     
     def get_queryset(self):
         return User.objects.all()
 
-class MessageViewSet(viewsets.ModelViewSet):
+class MessageViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering = '-created_at'
 
     def get_queryset(self):
         user = self.request.user
@@ -108,8 +111,9 @@ class MessageViewSet(viewsets.ModelViewSet):
         message = serializer.save(sender=self.request.user)
         
         # Notify recipient about new message
-        create_notification(
-            user=message.recipient,
+        enqueue(
+            'notifications.utils.bulk_create_notifications',
+            user_ids=[message.recipient_id],
             notification_type='message',
             message=f"New message from {self.request.user.username}: {message.subject}",
             related_object_id=message.id
@@ -164,7 +168,7 @@ def volunteer_applications(request):
         return Response({"detail": "Only volunteers can access this endpoint"}, 
                         status=status.HTTP_403_FORBIDDEN)
     
-    applications = Application.objects.filter(volunteer=request.user)
+    applications = plan_queryset(Application.objects.filter(volunteer=request.user), ApplicationSerializer)
     serializer = ApplicationSerializer(applications, many=True)
     return Response(serializer.data)
 
@@ -176,7 +180,9 @@ def organization_applications(request):
         return Response({"detail": "Only organizations can access this endpoint"}, 
                         status=status.HTTP_403_FORBIDDEN)
     
-    applications = Application.objects.filter(opportunity__organization=request.user)
+    applications = plan_queryset(
+        Application.objects.filter(opportunity__organization=request.user), ApplicationSerializer
+    )
     serializer = ApplicationSerializer(applications, many=True)
     return Response(serializer.data)
 
@@ -194,7 +200,7 @@ def opportunity_applications(request, opportunity_id):
         return Response({"detail": "You don't have permission to view these applications"}, 
                         status=status.HTTP_403_FORBIDDEN)
     
-    applications = Application.objects.filter(opportunity=opportunity)
+    applications = plan_queryset(Application.objects.filter(opportunity=opportunity), ApplicationSerializer)
     serializer = ApplicationSerializer(applications, many=True)
     return Response(serializer.data)
 
@@ -203,7 +209,7 @@ def opportunity_applications(request, opportunity_id):
 def update_application_status(request, application_id):
     """Update the status of an application (approve/reject)"""
     try:
-        application = Application.objects.get(id=application_id)
+        application = plan_queryset(Application.objects, ApplicationSerializer).get(id=application_id)
     except Application.DoesNotExist:
         return Response({"detail": "Application not found"}, status=status.HTTP_404_NOT_FOUND)
     
@@ -0,0 +1,49 @@
+"""
+Canonical form of the free-form strings stored in ``User.skills``,
+``User.interests`` and ``Opportunity.required_skills``.
+
+Values are canonicalized on save so equality, JSON containment (``@>``)
+and key lookups (``?|``) can be answered from the GIN indexes on those
+columns instead of comparing case-folded strings row by row.
+"""
+
+
+def normalize_skill(value):
+    """``'  Data   Entry '`` -> ``'data entry'``"""
+    return ' '.join(str(value).split()).lower()
+
+
+def normalize_skills(values):
+    """Canonical, de-duplicated skill list; anything but a list is returned unchanged"""
+    if not isinstance(values, list):
+        return values
+    skills = []
+    for value in values:
+        if value in (None, ''):
+            continue
+        skill = normalize_skill(value)
+        if skill and skill not in skills:
+            skills.append(skill)
+    return skills
+
+
+def normalize_interests(values, choices):
+    """
+    Map interests to the labels of ``choices`` (``(code, label)`` pairs),
+    matching codes or labels case-insensitively; unknown interests are only
+    stripped of surrounding whitespace.
+    """
+    if not isinstance(values, list):
+        return values
+    lookup = {}
+    for code, label in choices:
+        lookup[code.lower()] = label
+        lookup[label.lower()] = label
+    interests = []
+    for value in values:
+        if not isinstance(value, str) or not value.strip():
+            continue
+        interest = lookup.get(' '.join(value.split()).lower(), value.strip())
+        if interest not in interests:
+            interests.append(interest)
+    return interests
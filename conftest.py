@@ -0,0 +1,13 @@
+import pytest
+from django.core.cache import caches
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Cached API responses and the volunteer matrix must not leak between tests
+    from opportunities.scoring import reset_volunteer_matrix
+
+    for cache in caches.all():
+        cache.clear()
+    reset_volunteer_matrix()
+    yield
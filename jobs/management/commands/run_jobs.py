@@ -0,0 +1,24 @@
+import time
+from django.core.management.base import BaseCommand
+from jobs.worker import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued jobs from the database job table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help="Jobs claimed per poll")
+        parser.add_argument('--sleep', type=float, default=1.0, help="Seconds to wait when the queue is empty")
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit")
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            processed = run_pending_jobs(batch_size=options['batch_size'])
+            total += processed
+            if processed:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
+        self.stdout.write(f"Processed {total} jobs")
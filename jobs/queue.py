@@ -0,0 +1,90 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+def run_job(name, payload):
+    """Import the callable at dotted path ``name`` and call it with ``payload``"""
+    return import_string(name)(**payload)
+
+def _max_attempts():
+    return getattr(settings, 'JOBS_MAX_ATTEMPTS', 3)
+
+class ImmediateBackend:
+    """Runs jobs in the calling thread once the current transaction commits."""
+
+    def enqueue(self, name, payload):
+        transaction.on_commit(lambda: run_job(name, payload))
+
+class ThreadPoolBackend:
+    """Runs jobs on an in-process thread pool once the current transaction commits.
+
+    Jobs are lost if the process exits before they run; use the database
+    backend for side-effects that must survive a restart.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'JOBS_THREAD_WORKERS', 4),
+                    thread_name_prefix='jobs',
+                )
+            return self._executor
+
+    def enqueue(self, name, payload):
+        transaction.on_commit(lambda: self.executor.submit(self._run, name, payload))
+
+    def _run(self, name, payload):
+        try:
+            for attempt in range(1, _max_attempts() + 1):
+                try:
+                    return run_job(name, payload)
+                except Exception:
+                    logger.exception("Job %s failed (attempt %s)", name, attempt)
+        finally:
+            # Worker threads open their own connections; don't leak them
+            connections.close_all()
+
+class DatabaseBackend:
+    """Stores jobs in the ``jobs.Job`` table for the ``run_jobs`` worker.
+
+    The row is written in the caller's transaction, so a job is only
+    visible to workers if the change that queued it is committed.
+    """
+
+    def enqueue(self, name, payload):
+        Job.objects.create(name=name, payload=payload, max_attempts=_max_attempts())
+
+JOB_BACKENDS = {
+    'immediate': ImmediateBackend,
+    'thread': ThreadPoolBackend,
+    'database': DatabaseBackend,
+}
+
+_backends = {}
+
+def get_backend():
+    name = getattr(settings, 'JOBS_BACKEND', 'thread')
+    if name not in _backends:
+        _backends[name] = JOB_BACKENDS[name]()
+    return _backends[name]
+
+def enqueue(name, **payload):
+    """
+    Queue a call to the function at dotted path ``name``.
+
+    ``payload`` must be JSON serializable (ids and plain values, not model
+    instances) so every backend can carry it.
+    """
+    get_backend().enqueue(name, payload)
@@ -0,0 +1,56 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from accounts.models import User
+from notifications.models import Notification
+from .models import Job
+from .queue import enqueue
+from .worker import run_pending_jobs
+
+
+def failing_job(**kwargs):
+    raise RuntimeError("boom")
+
+
+@pytest.mark.django_db
+class TestJobQueue:
+    @pytest.fixture
+    def volunteer(self):
+        return User.objects.create_user(username='voluser', password='testpass123', is_volunteer=True)
+
+    def test_database_backend_queues_and_runs_jobs(self, settings, volunteer):
+        settings.JOBS_BACKEND = 'database'
+        enqueue('notifications.utils.notify_volunteers', notification_type='opportunity', message='Hello')
+
+        job = Job.objects.get()
+        assert job.status == 'PENDING'
+        assert Notification.objects.count() == 0
+
+        assert run_pending_jobs() == 1
+        job.refresh_from_db()
+        assert job.status == 'DONE'
+        assert Notification.objects.get().user == volunteer
+
+    def test_failed_jobs_are_retried_then_marked_failed(self, settings):
+        settings.JOBS_BACKEND = 'database'
+        settings.JOBS_MAX_ATTEMPTS = 2
+        enqueue('jobs.tests.failing_job')
+
+        run_pending_jobs()
+        job = Job.objects.get()
+        assert (job.status, job.attempts) == ('PENDING', 1)
+        assert job.run_after > timezone.now()
+        assert 'boom' in job.last_error
+
+        Job.objects.update(run_after=timezone.now() - timedelta(seconds=1))
+        run_pending_jobs()
+        job.refresh_from_db()
+        assert (job.status, job.attempts) == ('FAILED', 2)
+
+    def test_immediate_backend_runs_after_commit(self, settings, volunteer, django_capture_on_commit_callbacks):
+        settings.JOBS_BACKEND = 'immediate'
+        with django_capture_on_commit_callbacks(execute=True):
+            enqueue('notifications.utils.bulk_create_notifications',
+                    user_ids=[volunteer.id], notification_type='message', message='Hi')
+            assert Notification.objects.count() == 0
+        assert Notification.objects.get().user == volunteer
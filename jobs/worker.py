@@ -0,0 +1,44 @@
+import logging
+import traceback
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from .models import Job
+from .queue import run_job
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_DELAY = timedelta(seconds=10)
+
+def run_pending_jobs(batch_size=50):
+    """
+    Claim and run up to ``batch_size`` due jobs from the ``jobs.Job`` table.
+
+    Rows are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` so several
+    workers can poll the table without running the same job twice. Each job
+    runs in its own savepoint; a failure is rescheduled with exponential
+    backoff until ``max_attempts`` is reached. Returns the number of jobs run.
+    """
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status='PENDING', run_after__lte=timezone.now())
+            .order_by('run_after', 'id')[:batch_size]
+        )
+        for job in jobs:
+            job.attempts += 1
+            try:
+                with transaction.atomic():
+                    run_job(job.name, job.payload)
+            except Exception:
+                logger.exception("Job %s (%s) failed", job.id, job.name)
+                job.last_error = traceback.format_exc()
+                if job.attempts >= job.max_attempts:
+                    job.status = 'FAILED'
+                else:
+                    job.run_after = timezone.now() + RETRY_BASE_DELAY * 2 ** (job.attempts - 1)
+            else:
+                job.status = 'DONE'
+                job.last_error = ''
+            job.save(update_fields=['status', 'attempts', 'run_after', 'last_error', 'updated_at'])
+    return len(jobs)
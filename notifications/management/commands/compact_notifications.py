@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from notifications.retention import archive_read_notifications
+
+
+class Command(BaseCommand):
+    help = "Move old read notifications into the notification archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help="Archive read notifications older than this (default: NOTIFICATION_RETENTION_DAYS)")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        moved = archive_read_notifications(options['days'], batch_size=options['batch_size'])
+        self.stdout.write(f"Archived {moved} notifications")
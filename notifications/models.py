@@ -21,6 +21,62 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Inbox listing and unread filtering for a single user
+            models.Index(fields=['user', '-created_at'], name='notif_user_created_idx'),
+            models.Index(fields=['user', 'is_read', '-created_at'], name='notif_user_read_created_idx'),
+            # Retention scan over read notifications
+            models.Index(fields=['created_at'], condition=models.Q(is_read=True), name='notif_read_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_notification_type_display()} for {self.user.username}"
+
+class NotificationArchive(models.Model):
+    """Read notifications moved out of the live table by the retention job."""
+    original_id = models.BigIntegerField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    notification_type = models.CharField(max_length=20, choices=Notification.NOTIFICATION_TYPES)
+    message = models.TextField()
+    related_object_id = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+class Broadcast(models.Model):
+    """A notification stored once and shown to every user in its audience."""
+    AUDIENCE_CHOICES = (
+        ('volunteers', 'Volunteers'),
+        ('all', 'All users'),
+    )
+
+    notification_type = models.CharField(max_length=20, choices=Notification.NOTIFICATION_TYPES)
+    message = models.TextField()
+    related_object_id = models.PositiveIntegerField(null=True, blank=True)
+    audience = models.CharField(max_length=20, choices=AUDIENCE_CHOICES, default='volunteers')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['audience', '-created_at'], name='broadcast_audience_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_notification_type_display()} for {self.get_audience_display()}"
+
+class BroadcastReceipt(models.Model):
+    """Sparse read state: a row exists only once a user has read a broadcast."""
+    broadcast = models.ForeignKey(Broadcast, on_delete=models.CASCADE, related_name='receipts')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='broadcast_receipts')
+    read_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('broadcast', 'user')
+
+class BroadcastWatermark(models.Model):
+    """Every broadcast created at or before ``read_through`` counts as read for ``user``."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='broadcast_watermark')
+    read_through = models.DateTimeField()
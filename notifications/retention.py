@@ -0,0 +1,47 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import Notification, NotificationArchive
+
+# Moves one batch of old read notifications into the archive in a single statement
+ARCHIVE_BATCH_SQL = """
+WITH moved AS (
+    DELETE FROM {live}
+    WHERE id IN (
+        SELECT id FROM {live}
+        WHERE is_read AND created_at < %s
+        ORDER BY created_at
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, user_id, notification_type, message, related_object_id, created_at
+)
+INSERT INTO {archive} (original_id, user_id, notification_type, message, related_object_id, created_at, archived_at)
+SELECT id, user_id, notification_type, message, related_object_id, created_at, %s FROM moved
+"""
+
+def archive_read_notifications(older_than_days=None, batch_size=5000):
+    """
+    Move read notifications older than ``older_than_days`` into the archive.
+
+    Work is done in batches, each in its own short transaction, so the
+    live table is never locked for long. Returns the number of rows moved.
+    """
+    if older_than_days is None:
+        older_than_days = getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 90)
+    now = timezone.now()
+    cutoff = now - timedelta(days=older_than_days)
+    sql = ARCHIVE_BATCH_SQL.format(
+        live=connection.ops.quote_name(Notification._meta.db_table),
+        archive=connection.ops.quote_name(NotificationArchive._meta.db_table),
+    )
+
+    moved = 0
+    while True:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, [cutoff, batch_size, now])
+            batch = cursor.rowcount
+        moved += batch
+        if batch < batch_size:
+            return moved
@@ -1,8 +1,26 @@
 from rest_framework import serializers
-from .models import Notification
+from .models import Notification, Broadcast
 
 class NotificationSerializer(serializers.ModelSerializer):
+    kind = serializers.SerializerMethodField()
+
     class Meta:
         model = Notification
-        fields = ['id', 'notification_type', 'message', 'related_object_id', 'is_read', 'created_at']
+        fields = ['id', 'kind', 'notification_type', 'message', 'related_object_id', 'is_read', 'created_at']
         read_only_fields = ['id', 'notification_type', 'message', 'related_object_id', 'created_at']
+
+    def get_kind(self, obj):
+        return 'personal'
+
+class BroadcastSerializer(serializers.ModelSerializer):
+    """Renders a broadcast in the same shape as a personal notification"""
+    kind = serializers.SerializerMethodField()
+    is_read = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = Broadcast
+        fields = ['id', 'kind', 'notification_type', 'message', 'related_object_id', 'is_read', 'created_at']
+        read_only_fields = fields
+
+    def get_kind(self, obj):
+        return 'broadcast'
@@ -1,9 +1,12 @@
+from datetime import timedelta
 from django.test import TestCase
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
-from .models import Notification
-from .utils import create_notification
+from .models import Notification, NotificationArchive, BroadcastReceipt
+from .retention import archive_read_notifications
+from .utils import create_notification, bulk_create_notifications, notify_volunteers, create_broadcast
 
 User = get_user_model()
 
@@ -22,7 +25,7 @@ class NotificationTests(TestCase):
         create_notification(self.user, 'opportunity', 'Test notification')
         response = self.client.get('/api/notifications/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_mark_notification_as_read(self):
         notification = create_notification(self.user, 'opportunity', 'Test notification')
@@ -30,3 +33,101 @@ class NotificationTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(Notification.objects.first().is_read)
 
+class BulkNotificationTests(TestCase):
+    def setUp(self):
+        self.volunteers = [
+            User.objects.create_user(username=f'volunteer{i}', password='testpass', is_volunteer=True)
+            for i in range(5)
+        ]
+        self.organization = User.objects.create_user(username='org', password='testpass', is_organization=True)
+
+    def test_notify_volunteers_fans_out_in_chunks(self):
+        created = notify_volunteers('opportunity', 'New opportunity available: Test', related_object_id=1, chunk_size=2)
+        self.assertEqual(created, 5)
+        self.assertEqual(
+            set(Notification.objects.values_list('user_id', flat=True)),
+            {volunteer.id for volunteer in self.volunteers}
+        )
+
+    def test_bulk_create_notifications_is_deduplicated(self):
+        ids = [self.volunteers[0].id, self.volunteers[0].id, self.volunteers[1].id]
+        self.assertEqual(bulk_create_notifications(ids, 'event', 'New event scheduled: Test', 7, chunk_size=1), 2)
+        self.assertEqual(bulk_create_notifications(ids, 'event', 'New event scheduled: Test', 7), 0)
+        self.assertEqual(Notification.objects.count(), 2)
+
+class NotificationRetentionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+
+    def test_old_read_notifications_are_archived(self):
+        old_read = create_notification(self.user, 'opportunity', 'Old read')
+        old_unread = create_notification(self.user, 'opportunity', 'Old unread')
+        recent_read = create_notification(self.user, 'opportunity', 'Recent read')
+        Notification.objects.filter(id__in=[old_read.id, recent_read.id]).update(is_read=True)
+        Notification.objects.filter(id__in=[old_read.id, old_unread.id]).update(
+            created_at=timezone.now() - timedelta(days=120)
+        )
+
+        self.assertEqual(archive_read_notifications(older_than_days=90, batch_size=1), 1)
+
+        self.assertEqual(
+            set(Notification.objects.values_list('id', flat=True)),
+            {old_unread.id, recent_read.id}
+        )
+        archived = NotificationArchive.objects.get()
+        self.assertEqual((archived.original_id, archived.user, archived.message), (old_read.id, self.user, 'Old read'))
+
+class BroadcastTests(TestCase):
+    def setUp(self):
+        self.volunteer = User.objects.create_user(username='volunteer', password='testpass', is_volunteer=True)
+        self.organization = User.objects.create_user(username='org', password='testpass', is_organization=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.volunteer)
+
+    def test_feed_merges_personal_notifications_and_broadcasts(self):
+        create_notification(self.volunteer, 'message', 'Personal')
+        broadcast = create_broadcast('opportunity', 'New opportunity available: Park cleanup', related_object_id=3)
+
+        response = self.client.get('/api/notifications/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(item['kind'], item['message']) for item in response.data['results']],
+            [('broadcast', broadcast.message), ('personal', 'Personal')]
+        )
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_broadcasts_are_limited_to_their_audience(self):
+        create_broadcast('event', 'New event scheduled: Food drive')
+        self.client.force_authenticate(user=self.organization)
+        response = self.client.get('/api/notifications/')
+        self.assertEqual(response.data['results'], [])
+
+    def test_broadcast_read_state_is_tracked_per_user(self):
+        first = create_broadcast('event', 'First')
+        create_broadcast('event', 'Second')
+
+        response = self.client.post(f'/api/notifications/broadcasts/{first.id}/mark_read/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        read_state = {item['message']: item['is_read'] for item in self.client.get('/api/notifications/').data['results']}
+        self.assertEqual(read_state, {'First': True, 'Second': False})
+
+        self.client.post('/api/notifications/mark_all_read/')
+        self.assertTrue(all(item['is_read'] for item in self.client.get('/api/notifications/').data['results']))
+        self.assertEqual(BroadcastReceipt.objects.filter(user=self.volunteer).count(), 1)
+
+    def test_feed_pages_with_a_stable_cursor(self):
+        for i in range(3):
+            create_notification(self.volunteer, 'message', f'Personal {i}')
+            create_broadcast('event', f'Broadcast {i}')
+        # Identical timestamps must not skip or repeat rows across pages
+        Notification.objects.update(created_at=timezone.now())
+
+        seen = []
+        url = '/api/notifications/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen.extend((item['kind'], item['id']) for item in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(len(set(seen)), 6)
@@ -1,4 +1,12 @@
-from .models import Notification
+from itertools import islice
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import BooleanField, Case, Exists, OuterRef, Value, When
+from .models import Notification, Broadcast, BroadcastReceipt, BroadcastWatermark
+
+User = get_user_model()
+
+FANOUT_CHUNK_SIZE = 2000
 
 def create_notification(user, notification_type, message, related_object_id=None):
     return Notification.objects.create(
@@ -7,3 +15,101 @@ def create_notification(user, notification_type, message, related_object_id=None
         message=message,
         related_object_id=related_object_id
     )
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def bulk_create_notifications(user_ids, notification_type, message, related_object_id=None,
+                              chunk_size=FANOUT_CHUNK_SIZE):
+    """
+    Create the same notification for every user id in ``user_ids``.
+
+    Ids are consumed in chunks and written with ``bulk_create`` inside a
+    single transaction. Users that already hold an identical notification
+    are skipped, so duplicate ids and retried runs do not notify twice.
+    Only plain values are accepted, which keeps the call safe to hand to a
+    background worker. Returns the number of notifications created.
+    """
+    created = 0
+    with transaction.atomic():
+        for chunk in _chunked(user_ids, chunk_size):
+            already_notified = set(
+                Notification.objects.filter(
+                    user_id__in=chunk,
+                    notification_type=notification_type,
+                    message=message,
+                    related_object_id=related_object_id,
+                ).values_list('user_id', flat=True)
+            )
+            pending = dict.fromkeys(uid for uid in chunk if uid not in already_notified)
+            Notification.objects.bulk_create(
+                [
+                    Notification(
+                        user_id=user_id,
+                        notification_type=notification_type,
+                        message=message,
+                        related_object_id=related_object_id,
+                    )
+                    for user_id in pending
+                ],
+                batch_size=chunk_size,
+            )
+            created += len(pending)
+    return created
+
+def bulk_create_individual_notifications(notifications, chunk_size=FANOUT_CHUNK_SIZE):
+    """
+    Create one notification per dict in ``notifications`` (``user_id``,
+    ``notification_type``, ``message`` and optionally ``related_object_id``)
+    with chunked ``bulk_create`` in one transaction. Returns the number created.
+    """
+    created = 0
+    with transaction.atomic():
+        for chunk in _chunked(notifications, chunk_size):
+            Notification.objects.bulk_create([Notification(**fields) for fields in chunk], batch_size=chunk_size)
+            created += len(chunk)
+    return created
+
+def notify_volunteers(notification_type, message, related_object_id=None, chunk_size=FANOUT_CHUNK_SIZE):
+    """Fan a notification out to every volunteer, streaming their ids from the database"""
+    volunteer_ids = (
+        User.objects.filter(is_volunteer=True)
+        .order_by('id')
+        .values_list('id', flat=True)
+        .iterator(chunk_size=chunk_size)
+    )
+    return bulk_create_notifications(
+        volunteer_ids, notification_type, message, related_object_id, chunk_size=chunk_size
+    )
+
+def create_broadcast(notification_type, message, related_object_id=None, audience='volunteers'):
+    """Store a single notification that every user in ``audience`` will see"""
+    return Broadcast.objects.create(
+        notification_type=notification_type,
+        message=message,
+        related_object_id=related_object_id,
+        audience=audience
+    )
+
+def visible_broadcasts(user):
+    """
+    Broadcasts addressed to ``user``, newest first, annotated with ``is_read``.
+
+    Only broadcasts created after the user joined are included, matching what
+    a per-user copy made at broadcast time would have produced.
+    """
+    audiences = ['all', 'volunteers'] if user.is_volunteer else ['all']
+    is_read = Exists(BroadcastReceipt.objects.filter(broadcast=OuterRef('pk'), user=user))
+    watermark = BroadcastWatermark.objects.filter(user=user).values_list('read_through', flat=True).first()
+    if watermark is not None:
+        is_read = Case(
+            When(created_at__lte=watermark, then=Value(True)),
+            default=is_read,
+            output_field=BooleanField(),
+        )
+    return Broadcast.objects.filter(
+        audience__in=audiences,
+        created_at__gte=user.date_joined,
+    ).annotate(is_read=is_read)
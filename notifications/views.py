@@ -1,16 +1,33 @@
+from django.utils import timezone
 from rest_framework import viewsets, permissions
-from .models import Notification
-from .serializers import NotificationSerializer
+from .models import Notification, Broadcast, BroadcastReceipt, BroadcastWatermark
+from .serializers import NotificationSerializer, BroadcastSerializer
+from .utils import visible_broadcasts
 from rest_framework.mixins import UpdateModelMixin
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.generics import get_object_or_404
+from volunteer_bridge.query_planning import QueryPlanMixin
 
-class NotificationViewSet(viewsets.ReadOnlyModelViewSet, UpdateModelMixin):
+class NotificationViewSet(QueryPlanMixin, viewsets.ReadOnlyModelViewSet, UpdateModelMixin):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering = '-created_at'
     
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        """Personal notifications and broadcasts merged into one newest-first feed"""
+        personal = self.filter_queryset(self.get_queryset())
+        broadcasts = visible_broadcasts(request.user)
+        page = self.paginator.paginate_querysets([broadcasts, personal], request, self)
+        return self.get_paginated_response([self.serialize_feed_item(item) for item in page])
+
+    def serialize_feed_item(self, item):
+        if isinstance(item, Broadcast):
+            return BroadcastSerializer(item, context=self.get_serializer_context()).data
+        return self.get_serializer(item).data
     
     @action(detail=True, methods=['POST'])
     def mark_read(self, request, pk=None):
@@ -19,3 +36,19 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet, UpdateModelMixin):
         notification.save()
         serializer = self.get_serializer(notification)
         return Response(serializer.data)
+
+    @action(detail=False, methods=['POST'], url_path=r'broadcasts/(?P<broadcast_id>\d+)/mark_read')
+    def mark_broadcast_read(self, request, broadcast_id=None):
+        broadcast = get_object_or_404(visible_broadcasts(request.user), pk=broadcast_id)
+        BroadcastReceipt.objects.get_or_create(broadcast=broadcast, user=request.user)
+        broadcast.is_read = True
+        return Response(BroadcastSerializer(broadcast).data)
+
+    @action(detail=False, methods=['POST'])
+    def mark_all_read(self, request):
+        """Mark every personal notification and every broadcast so far as read"""
+        self.get_queryset().filter(is_read=False).update(is_read=True)
+        BroadcastWatermark.objects.update_or_create(
+            user=request.user, defaults={'read_through': timezone.now()}
+        )
+        return Response({'status': 'all notifications read'})
@@ -0,0 +1,152 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from jobs.queue import enqueue
+from .caching import invalidate_on_commit
+from .models import Event, RSVP
+
+ATTENDING = 'ATTENDING'
+WAITLISTED = 'WAITLISTED'
+CANCELLED = 'CANCELLED'
+
+class AdmissionError(Exception):
+    pass
+
+class EventFull(AdmissionError):
+    pass
+
+class AlreadyRegistered(AdmissionError):
+    pass
+
+def adjust_attending_count(event_id, delta):
+    """Atomically add ``delta`` to an event's denormalized attendee count"""
+    if delta:
+        Event.objects.filter(pk=event_id).update(attending_count=F('attending_count') + delta)
+
+def lock_event(event_id):
+    """
+    Lock an event's row for the rest of the transaction. Everything that
+    changes an event's RSVPs locks the event first, then the RSVPs, so that
+    promotion and cancellation cannot deadlock on each other.
+    """
+    Event.objects.select_for_update().filter(pk=event_id).values_list('pk', flat=True).first()
+
+def _attending_delta(old_status, new_status):
+    return (new_status == ATTENDING) - (old_status == ATTENDING)
+
+def create_rsvp(user, event, status):
+    """Create an RSVP and count it towards ``Event.attending_count``"""
+    with transaction.atomic():
+        rsvp = RSVP.objects.create(user=user, event=event, status=status)
+        adjust_attending_count(event.pk, _attending_delta(None, status))
+    return rsvp
+
+def set_rsvp_status(rsvp, status):
+    """Move an RSVP to ``status``, keeping ``Event.attending_count`` current"""
+    with transaction.atomic():
+        lock_event(rsvp.event_id)
+        old_status = (
+            RSVP.objects.select_for_update().filter(pk=rsvp.pk).values_list('status', flat=True).get()
+        )
+        rsvp.status = status
+        rsvp.save(update_fields=['status', 'updated_at'])
+        adjust_attending_count(rsvp.event_id, _attending_delta(old_status, status))
+    return rsvp
+
+def _claim_slot(event_id):
+    """Take an attending slot if one is free; a single conditional UPDATE"""
+    return Event.objects.filter(
+        pk=event_id, attending_count__lt=F('max_attendees')
+    ).update(attending_count=F('attending_count') + 1) == 1
+
+def _next_waitlist_position(event_id):
+    Event.objects.filter(pk=event_id).update(waitlist_sequence=F('waitlist_sequence') + 1)
+    # The UPDATE above holds the event row lock until commit, so this read is ours
+    return Event.objects.filter(pk=event_id).values_list('waitlist_sequence', flat=True).get()
+
+def admit(user, event):
+    """
+    RSVP ``user`` to ``event`` without oversubscribing it.
+
+    A slot is claimed with ``UPDATE ... SET attending_count = attending_count + 1
+    WHERE attending_count < max_attendees``, which the database serializes on
+    the event row, so concurrent requests can never admit more than
+    ``max_attendees`` people. When no slot is left the user is waitlisted
+    with the next FIFO position, or ``EventFull`` is raised if the event has
+    no waitlist. A user who cancelled gets their RSVP back the same way. A
+    second active RSVP from the same user raises ``AlreadyRegistered`` and
+    releases anything claimed for it.
+    """
+    try:
+        with transaction.atomic():
+            lock_event(event.pk)
+            # The cancelled RSVP still holds the (user, event) unique key
+            rsvp = (
+                RSVP.objects.select_for_update().filter(user=user, event=event, status=CANCELLED).first()
+                or RSVP(user=user, event=event)
+            )
+            if _claim_slot(event.pk):
+                rsvp.status, rsvp.waitlist_position = ATTENDING, None
+            elif not event.waitlist_enabled:
+                raise EventFull(event.pk)
+            else:
+                rsvp.status, rsvp.waitlist_position = WAITLISTED, _next_waitlist_position(event.pk)
+            rsvp.save()
+            return rsvp
+    except IntegrityError:
+        raise AlreadyRegistered(event.pk)
+
+def promote_waitlist(event_id):
+    """
+    Fill an event's free slots from the head of its waitlist.
+
+    The event row is locked, the first ``max_attendees - attending_count``
+    waitlisted RSVPs (FIFO by waitlist position, then ``created_at``) are
+    moved to ATTENDING in one UPDATE, and their notifications are queued as
+    one job. Only the promoted rows are read, however long the
+    waitlist is. Returns the ids of the promoted users.
+    """
+    with transaction.atomic():
+        event = Event.objects.select_for_update().filter(pk=event_id).first()
+        if event is None:
+            return []
+        free = event.max_attendees - event.attending_count
+        if free <= 0:
+            return []
+
+        promoted = list(
+            RSVP.objects.select_for_update()
+            .filter(event_id=event_id, status=WAITLISTED)
+            .order_by('waitlist_position', 'created_at')
+            .values_list('id', 'user_id')[:free]
+        )
+        if not promoted:
+            return []
+
+        rsvp_ids = [rsvp_id for rsvp_id, _ in promoted]
+        user_ids = [user_id for _, user_id in promoted]
+        RSVP.objects.filter(id__in=rsvp_ids).update(status=ATTENDING, waitlist_position=None)
+        adjust_attending_count(event_id, len(promoted))
+        # Bulk updates bypass the RSVP signals
+        invalidate_on_commit('events', event_id)
+        # One notification per promotion: a user promoted off this waitlist
+        # again after cancelling must hear about it again
+        enqueue(
+            'notifications.utils.bulk_create_individual_notifications',
+            notifications=[
+                {
+                    'user_id': user_id,
+                    'notification_type': 'rsvp',
+                    'message': f"A spot opened up: you're now attending {event.title}",
+                    'related_object_id': event_id,
+                }
+                for user_id in user_ids
+            ],
+        )
+    return user_ids
+
+def cancel_rsvp(rsvp):
+    """Cancel an RSVP and hand any freed slot to the waitlist"""
+    with transaction.atomic():
+        set_rsvp_status(rsvp, CANCELLED)
+        promote_waitlist(rsvp.event_id)
+    return rsvp
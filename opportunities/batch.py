@@ -0,0 +1,93 @@
+import time
+from multiprocessing import Pool
+from types import SimpleNamespace
+from django.db import transaction
+from django.utils import timezone
+from .models import Opportunity, OpportunityMatch
+from .scoring import VolunteerMatrix, matching_weights
+
+OPPORTUNITY_FIELDS = ('id', 'category', 'required_skills', 'virtual', 'commitment_hours')
+
+# Set in each pool worker by _init_worker
+_worker_state = None
+
+
+def _init_worker(matrix, weights, top, min_score):
+    global _worker_state
+    _worker_state = (matrix, weights, top, min_score)
+
+
+def _score_chunk(opportunities):
+    matrix, weights, top, min_score = _worker_state
+    return [
+        (opportunity.id, matrix.score(opportunity, weights, limit=top, min_score=min_score))
+        for opportunity in opportunities
+    ]
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _write_matches(results, computed_at, batch_size):
+    """Replace the stored matches of the opportunities in ``results``"""
+    rows = [
+        OpportunityMatch(
+            opportunity_id=opportunity_id, volunteer_id=volunteer_id, score=score, rank=rank,
+            computed_at=computed_at,
+        )
+        for opportunity_id, scores in results
+        for rank, (volunteer_id, score) in enumerate(scores, start=1)
+    ]
+    with transaction.atomic():
+        OpportunityMatch.objects.filter(opportunity_id__in=[opportunity_id for opportunity_id, _ in results]).delete()
+        OpportunityMatch.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def match_open_opportunities(top=50, min_score=None, processes=1, chunk_size=200, batch_size=2000):
+    """
+    Compute the ``top`` volunteers of every OPEN opportunity and store them
+    in ``OpportunityMatch``.
+
+    Volunteers are loaded once into a ``VolunteerMatrix`` and every
+    opportunity is scored against it with the weighted matching engine;
+    with ``processes > 1`` chunks of ``chunk_size`` opportunities are scored
+    on a process pool. Results are written in bulk, one transaction per
+    chunk. Returns a dict of counts and throughput.
+    """
+    started = time.perf_counter()
+    computed_at = timezone.now()
+    matrix = VolunteerMatrix.load()
+    opportunities = [
+        SimpleNamespace(**dict(zip(OPPORTUNITY_FIELDS, row)))
+        for row in Opportunity.objects.filter(status='OPEN').values_list(*OPPORTUNITY_FIELDS)
+    ]
+    loaded = time.perf_counter()
+
+    state = (matrix, matching_weights(), top, min_score)
+    chunks = list(_chunks(opportunities, chunk_size))
+    matches = 0
+    if processes > 1 and len(chunks) > 1:
+        with Pool(processes, initializer=_init_worker, initargs=state) as pool:
+            for results in pool.imap_unordered(_score_chunk, chunks):
+                matches += _write_matches(results, computed_at, batch_size)
+    else:
+        _init_worker(*state)
+        for chunk in chunks:
+            matches += _write_matches(_score_chunk(chunk), computed_at, batch_size)
+
+    # Opportunities that closed since the last run keep no stale matches
+    OpportunityMatch.objects.exclude(opportunity__status='OPEN').delete()
+
+    finished = time.perf_counter()
+    scoring_seconds = finished - loaded
+    return {
+        'opportunities': len(opportunities),
+        'volunteers': matrix.size,
+        'matches': matches,
+        'load_seconds': loaded - started,
+        'scoring_seconds': scoring_seconds,
+        'opportunities_per_second': len(opportunities) / scoring_seconds if scoring_seconds else 0.0,
+    }
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import uuid
+from functools import partial
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+CACHE_ALIAS = 'listings'
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+def _token(key):
+    """Current version token stored under ``key``, created on first use"""
+    cache = _cache()
+    token = cache.get(key)
+    if token is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        token = cache.get(key)
+    return token
+
+def invalidate(resource, pk=None):
+    """
+    Drop cached ``resource`` listings, and the cached detail of ``pk``.
+
+    Entries are never deleted one by one: their keys embed a version token,
+    and replacing the token makes every old entry unreachable.
+    """
+    cache = _cache()
+    cache.set(f'{resource}:list-version', uuid.uuid4().hex, timeout=None)
+    if pk is not None:
+        cache.set(f'{resource}:{pk}:version', uuid.uuid4().hex, timeout=None)
+
+def invalidate_on_commit(resource, pk=None):
+    """
+    ``invalidate`` once the current transaction commits. Bumping the token
+    earlier would let a concurrent read cache the old rows under the new one.
+    """
+    transaction.on_commit(partial(invalidate, resource, pk))
+
+def _etag_matches(request, etag):
+    candidates = request.headers.get('If-None-Match', '')
+    return candidates.strip() == '*' or etag in [tag.strip() for tag in candidates.split(',')]
+
+class CachedResponseMixin:
+    """
+    Serve ``list``/``retrieve`` of a viewset from the listing cache.
+
+    The serialized payload is cached per URL (path and query parameters) and
+    sent with an ``ETag``; a matching ``If-None-Match`` gets an empty 304. A
+    hit does not touch the ORM. Set ``cache_resource`` on the viewset and call
+    ``invalidate_on_commit(cache_resource, pk)`` whenever the underlying data
+    changes.
+    """
+    cache_resource = None
+    cached_actions = ('list', 'retrieve')
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(f'{self.cache_resource}:list-version',
+                                    lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return self.cached_response(f'{self.cache_resource}:{pk}:version',
+                                    lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs))
+
+    def cached_response(self, version_key, build):
+        if self.action not in self.cached_actions:
+            return build()
+
+        request = self.request
+        url_digest = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        key = f'{self.cache_resource}:{_token(version_key)}:{url_digest}'
+        cache = _cache()
+        entry = cache.get(key)
+        if entry is None:
+            response = build()
+            if response.status_code != 200:
+                return response
+            content = JSONRenderer().render(response.data)
+            entry = (f'"{hashlib.md5(content).hexdigest()}"', json.loads(content))
+            cache.set(key, entry)
+
+        etag, payload = entry
+        if _etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(payload, headers={'ETag': etag})
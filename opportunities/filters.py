@@ -0,0 +1,70 @@
+from datetime import datetime, time, timedelta
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .models import Opportunity
+
+# Values of ``?ordering=``; each pairs with the pk for keyset pagination
+OPPORTUNITY_ORDERINGS = ('created_at', '-created_at', 'start_date', '-start_date', 'end_date', '-end_date')
+
+
+def _choices(params, name, choices):
+    values = [value.strip().upper() for value in params[name].split(',') if value.strip()]
+    allowed = {code for code, _ in choices}
+    unknown = [value for value in values if value not in allowed]
+    if unknown:
+        raise ValueError(f"{name}: expected any of {', '.join(sorted(allowed))}")
+    return values
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def opportunity_filters(params):
+    """
+    Queryset lookups for the listing filters in ``params``:
+
+    - ``category`` and ``status``: one or more codes, comma separated
+    - ``virtual``: ``true`` or ``false``
+    - ``location``: case-insensitive substring
+    - ``organization``: organization id
+    - ``from``/``to``: inclusive dates of ``start_date``, in the site time zone
+
+    Dates become a half-open ``start_date`` range rather than a ``__date``
+    lookup, so the composite indexes on ``start_date`` stay usable. Raises
+    ``ValueError`` for malformed values.
+    """
+    lookups = {}
+    for name, choices in (('category', Opportunity.CATEGORY_CHOICES), ('status', Opportunity.STATUS_CHOICES)):
+        if params.get(name):
+            values = _choices(params, name, choices)
+            if len(values) == 1:
+                lookups[name] = values[0]
+            elif values:
+                lookups[f'{name}__in'] = values
+    if params.get('virtual') not in (None, ''):
+        virtual = str(params['virtual']).lower()
+        if virtual not in ('true', 'false'):
+            raise ValueError("virtual: expected true or false")
+        lookups['virtual'] = virtual == 'true'
+    if params.get('location'):
+        lookups['location__icontains'] = params['location'].strip()
+    if params.get('organization'):
+        try:
+            lookups['organization_id'] = int(params['organization'])
+        except ValueError:
+            raise ValueError("organization: expected an id")
+    for name, lookup, days in (('from', 'start_date__gte', 0), ('to', 'start_date__lt', 1)):
+        if params.get(name):
+            day = parse_date(params[name])
+            if day is None:
+                raise ValueError(f"{name}: expected a YYYY-MM-DD date")
+            lookups[lookup] = _day_start(day + timedelta(days=days))
+    return lookups
+
+
+def opportunity_ordering(params, default):
+    ordering = params.get('ordering') or default
+    if ordering not in OPPORTUNITY_ORDERINGS:
+        raise ValueError(f"ordering: expected one of {', '.join(OPPORTUNITY_ORDERINGS)}")
+    return ordering
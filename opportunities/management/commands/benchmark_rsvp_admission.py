@@ -0,0 +1,72 @@
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from accounts.models import User
+from opportunities.attendance import admit, AdmissionError
+from opportunities.models import Event, RSVP
+
+
+class Command(BaseCommand):
+    help = "Fire concurrent RSVPs at one event and check that admission stays within capacity"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rsvps', type=int, default=300, help="Number of volunteers RSVPing at once")
+        parser.add_argument('--capacity', type=int, default=100, help="Event max_attendees")
+        parser.add_argument('--workers', type=int, default=50, help="Concurrent database connections")
+        parser.add_argument('--no-waitlist', action='store_true')
+        parser.add_argument('--keep', action='store_true', help="Keep the generated event and users")
+
+    def handle(self, *args, **options):
+        tag = f"rsvp-bench-{uuid.uuid4().hex[:8]}"
+        organizer = User.objects.create(username=f"{tag}-org", is_organization=True)
+        event = Event.objects.create(
+            title=tag, description="RSVP admission benchmark", location="Benchmark",
+            start_time=timezone.now() + timedelta(days=1), end_time=timezone.now() + timedelta(days=1, hours=1),
+            created_by=organizer, max_attendees=options['capacity'],
+            waitlist_enabled=not options['no_waitlist'],
+        )
+        volunteers = User.objects.bulk_create(
+            User(username=f"{tag}-{i}", is_volunteer=True) for i in range(options['rsvps'])
+        )
+
+        def rsvp(volunteer):
+            try:
+                return admit(volunteer, event).status
+            except AdmissionError as error:
+                return type(error).__name__
+            finally:
+                connection.close()
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                outcomes = Counter(pool.map(rsvp, volunteers))
+            elapsed = time.perf_counter() - started
+            self.report(event, outcomes, elapsed, options)
+        finally:
+            if not options['keep']:
+                User.objects.filter(username__startswith=tag).delete()
+
+    def report(self, event, outcomes, elapsed, options):
+        event.refresh_from_db()
+        attending = RSVP.objects.filter(event=event, status='ATTENDING').count()
+        positions = sorted(
+            RSVP.objects.filter(event=event, status='WAITLISTED').values_list('waitlist_position', flat=True)
+        )
+        expected_attending = min(options['capacity'], options['rsvps'])
+
+        self.stdout.write(f"{options['rsvps']} RSVPs with {options['workers']} workers in {elapsed:.2f}s "
+                          f"({options['rsvps'] / elapsed:.0f} RSVPs/sec)")
+        self.stdout.write(f"Outcomes: {dict(outcomes)}")
+        self.stdout.write(f"Attending: {attending} (counter {event.attending_count}, capacity {event.max_attendees})")
+
+        if attending != expected_attending or event.attending_count != attending:
+            raise CommandError("Admission count does not match capacity")
+        if positions != list(range(1, len(positions) + 1)):
+            raise CommandError("Waitlist positions are not unique and contiguous")
+        self.stdout.write(self.style.SUCCESS("Admission was correct"))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from opportunities.batch import match_open_opportunities
+
+
+class Command(BaseCommand):
+    help = "Store the best volunteers of every open opportunity in the batch match table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=50, help="Volunteers kept per opportunity")
+        parser.add_argument('--min-score', type=float, default=None)
+        parser.add_argument('--processes', type=int, default=1, help="Scoring processes")
+        parser.add_argument('--chunk-size', type=int, default=200, help="Opportunities per scoring task")
+
+    def handle(self, *args, **options):
+        stats = match_open_opportunities(
+            top=options['top'],
+            min_score=options['min_score'],
+            processes=options['processes'],
+            chunk_size=options['chunk_size'],
+        )
+        self.stdout.write(
+            f"Matched {stats['opportunities']} opportunities against {stats['volunteers']} volunteers: "
+            f"{stats['matches']} matches stored, loaded in {stats['load_seconds']:.2f}s, "
+            f"scored in {stats['scoring_seconds']:.2f}s ({stats['opportunities_per_second']:.1f} opportunities/sec)"
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from opportunities.recommendations import rebuild_recommendations
+
+
+class Command(BaseCommand):
+    help = "Rebuild the recommendation feed of every volunteer from the open opportunities"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        total = rebuild_recommendations(batch_size=options['batch_size'])
+        self.stdout.write(f"Stored {total} recommendations")
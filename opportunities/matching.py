@@ -1,30 +1,129 @@
 # opportunities/matching.py
-from collections import defaultdict
-from .models import Opportunity
-from accounts.models import User
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+from django.utils import timezone
+from django.db.models.expressions import RawSQL
+from accounts.models import User, VolunteerSkill
+from accounts.vocabulary import normalize_skills
+from .models import MatchRecord
+from .scoring import score_volunteers
 
-def match_volunteers_to_opportunities(opportunity):
+# Number of distinct required skills found in a volunteer's ``skills`` array
+JSONB_OVERLAP_SQL = (
+    "(SELECT COUNT(DISTINCT skill) FROM jsonb_array_elements_text("
+    "CASE WHEN jsonb_typeof({table}.skills) = 'array' THEN {table}.skills ELSE '[]'::jsonb END"
+    ") AS skill WHERE skill = ANY(%s::text[]))"
+)
+
+# Inserts ledger rows for the given volunteers and returns the ones that were new
+RECORD_MATCHES_SQL = """
+INSERT INTO {ledger} (opportunity_id, volunteer_id, matched_at)
+SELECT %s, volunteer_id, %s FROM unnest(%s::bigint[]) AS volunteer_id
+ON CONFLICT (opportunity_id, volunteer_id) DO NOTHING
+RETURNING volunteer_id
+"""
+
+
+def _required_skills(opportunity):
+    return sorted(normalize_skills(opportunity.required_skills or []))
+
+
+def _postings_scores(opportunity, top=None, min_score=None):
+    """Rank volunteers by how many required skill posting lists they appear in"""
+    required_skills = _required_skills(opportunity)
+    if not required_skills:
+        return []
+    scores = (
+        VolunteerSkill.objects.filter(skill__in=required_skills)
+        .values('volunteer_id')
+        .annotate(match_score=Count('id'))
+    )
+    if min_score is not None:
+        scores = scores.filter(match_score__gte=min_score)
+    return scores.order_by('-match_score', 'volunteer_id').values_list('volunteer_id', 'match_score')
+
+
+def _jsonb_scores(opportunity, top=None, min_score=None):
+    """Rank volunteers by the overlap of ``User.skills`` and the required skills, in SQL"""
+    required_skills = _required_skills(opportunity)
+    if not required_skills:
+        return []
+    overlap = RawSQL(
+        JSONB_OVERLAP_SQL.format(table=User._meta.db_table),
+        (required_skills,),
+    )
+    scores = User.objects.filter(is_volunteer=True, skills__has_any_keys=required_skills).annotate(match_score=overlap)
+    if min_score is not None:
+        scores = scores.filter(match_score__gte=min_score)
+    return scores.order_by('-match_score', 'id').values_list('id', 'match_score')
+
+
+def _weighted_scores(opportunity, top=None, min_score=None):
+    """Rank volunteers by the weighted multi-factor score of ``opportunities.scoring``"""
+    return score_volunteers(opportunity, limit=top, min_score=min_score)
+
+
+MATCHING_BACKENDS = {
+    'postings': _postings_scores,
+    'jsonb': _jsonb_scores,
+    'weighted': _weighted_scores,
+}
+
+
+def match_volunteers_to_opportunities(opportunity, limit=None, offset=0, min_score=None):
     """
     Match volunteers to a specific opportunity based on skills and interests
     Returns a list of potential volunteers sorted by match score
+
+    Scoring and ranking use the backend named by ``settings.MATCHING_BACKEND``:
+    ``postings`` counts hits in the inverted skill index and ``jsonb`` counts
+    the overlap of the JSON skill arrays, both in SQL; ``weighted`` combines
+    IDF-weighted skills, interests, virtual preference and weekly hours in
+    memory.
+
+    Only scores of at least ``min_score`` are returned. Backends never rank
+    more than ``offset + limit`` volunteers (SQL ``LIMIT`` or a bounded heap),
+    and only the volunteers on the requested page are loaded as ``User``
+    instances.
+    """
+    backend = MATCHING_BACKENDS[getattr(settings, 'MATCHING_BACKEND', 'postings')]
+    top = offset + limit if limit is not None else None
+    scores = backend(opportunity, top=top, min_score=min_score)
+    if limit is not None:
+        scores = scores[offset:offset + limit]
+    elif offset:
+        scores = scores[offset:]
+    scores = list(scores)
+    volunteers = User.objects.in_bulk([volunteer_id for volunteer_id, _ in scores])
+
+    return [
+        {'volunteer': volunteers[volunteer_id], 'match_score': score}
+        for volunteer_id, score in scores
+        if volunteer_id in volunteers
+    ]
+
+
+def record_matches(opportunity, volunteer_ids):
+    """
+    Add ``volunteer_ids`` to the match ledger of ``opportunity`` and return
+    the ids that were not in it yet, i.e. the volunteers to notify.
+
+    Volunteers already in the ledger are filtered out with a read first, so
+    repeated calls with the same matches do not write. The insert uses
+    ``ON CONFLICT DO NOTHING RETURNING`` so concurrent callers never notify
+    the same volunteer twice.
     """
-    matches = []
-    volunteers = User.objects.filter(is_volunteer=True)
-    
-    for volunteer in volunteers:
-        score = 0
-        # Check skills match
-        volunteer_skills = volunteer.skills or []
-        required_skills = opportunity.required_skills or []
-        
-        for skill in volunteer_skills:
-            if skill in required_skills:
-                score += 1
-                
-        if score > 0:
-            matches.append({
-                'volunteer': volunteer,
-                'match_score': score
-            })
-    
-    return sorted(matches, key=lambda x: x['match_score'], reverse=True)
+    volunteer_ids = set(volunteer_ids)
+    if not volunteer_ids:
+        return []
+    volunteer_ids -= set(
+        MatchRecord.objects.filter(opportunity=opportunity, volunteer_id__in=volunteer_ids)
+        .values_list('volunteer_id', flat=True)
+    )
+    if not volunteer_ids:
+        return []
+    sql = RECORD_MATCHES_SQL.format(ledger=connection.ops.quote_name(MatchRecord._meta.db_table))
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [opportunity.id, timezone.now(), sorted(volunteer_ids)])
+        return [volunteer_id for volunteer_id, in cursor.fetchall()]
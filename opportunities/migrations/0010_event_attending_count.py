@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0009_opportunity_commitment_hours_opportunity_virtual_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='attending_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_attending_count(apps, schema_editor):
+    Event = apps.get_model('opportunities', 'Event')
+    RSVP = apps.get_model('opportunities', 'RSVP')
+    attending = (
+        RSVP.objects.filter(event=OuterRef('pk'), status='ATTENDING')
+        .values('event')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    Event.objects.update(attending_count=Coalesce(Subquery(attending), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0010_event_attending_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_attending_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0011_backfill_event_attending_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='waitlist_sequence',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='rsvp',
+            name='waitlist_position',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
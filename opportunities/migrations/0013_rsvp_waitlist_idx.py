@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0012_rsvp_waitlist_position'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rsvp',
+            index=models.Index(fields=['event', 'status', 'waitlist_position'], name='rsvp_waitlist_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+from accounts.vocabulary import normalize_interests, normalize_skills
+
+
+def normalize_vocabulary(apps, schema_editor):
+    Opportunity = apps.get_model('opportunities', 'Opportunity')
+    User = apps.get_model('accounts', 'User')
+
+    changed = []
+    for opportunity in Opportunity.objects.only('id', 'required_skills').iterator(chunk_size=2000):
+        skills = normalize_skills(opportunity.required_skills)
+        if skills != opportunity.required_skills:
+            opportunity.required_skills = skills
+            changed.append(opportunity)
+        if len(changed) >= 2000:
+            Opportunity.objects.bulk_update(changed, ['required_skills'])
+            changed = []
+    if changed:
+        Opportunity.objects.bulk_update(changed, ['required_skills'])
+
+    # Interests name opportunity categories; store them as category labels
+    choices = Opportunity._meta.get_field('category').choices
+    changed = []
+    for user in User.objects.exclude(interests=None).only('id', 'interests').iterator(chunk_size=2000):
+        interests = normalize_interests(user.interests, choices)
+        if interests != user.interests:
+            user.interests = interests
+            changed.append(user)
+        if len(changed) >= 2000:
+            User.objects.bulk_update(changed, ['interests'])
+            changed = []
+    if changed:
+        User.objects.bulk_update(changed, ['interests'])
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0007_skill_vocabulary'),
+        ('opportunities', '0014_recommendation'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_vocabulary, migrations.RunPython.noop, atomic=True),
+        AddIndexConcurrently(
+            model_name='opportunity',
+            index=GinIndex(fields=['required_skills'], name='opportunity_skills_gin'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('opportunities', '0017_opportunitymatch'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='opportunity',
+            index=models.Index(fields=['status', 'start_date'], name='opp_status_start_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='opportunity',
+            index=models.Index(fields=['category', 'status'], name='opp_category_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='opportunity',
+            index=models.Index(fields=['organization', 'created_at'], name='opp_org_created_idx'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+import django.contrib.postgres.search
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+BACKFILL_BATCH_SIZE = 5000
+
+# Titles weigh more than descriptions in the ranking. The trigger also runs
+# when a save writes search_vector itself, so a stale or NULL value sent by
+# the ORM is always replaced.
+SEARCH_TRIGGER_SQL = """
+CREATE FUNCTION {table}_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER {table}_search_vector
+BEFORE INSERT OR UPDATE OF title, description, search_vector ON {table}
+FOR EACH ROW EXECUTE FUNCTION {table}_search_vector();
+"""
+
+DROP_SEARCH_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS {table}_search_vector ON {table};
+DROP FUNCTION IF EXISTS {table}_search_vector();
+"""
+
+SEARCH_TABLES = ('opportunities_opportunity', 'opportunities_event')
+
+
+def backfill_search_vectors(apps, schema_editor):
+    # Touching the column fires the trigger; one short transaction per batch
+    with schema_editor.connection.cursor() as cursor:
+        for table in SEARCH_TABLES:
+            cursor.execute(f'SELECT coalesce(max(id), 0) FROM {table}')
+            last_id = cursor.fetchone()[0]
+            for start in range(0, last_id, BACKFILL_BATCH_SIZE):
+                cursor.execute(
+                    f'UPDATE {table} SET search_vector = NULL WHERE id > %s AND id <= %s',
+                    [start, start + BACKFILL_BATCH_SIZE],
+                )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('opportunities', '0018_opportunity_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='opportunity',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        *(
+            migrations.RunSQL(SEARCH_TRIGGER_SQL.format(table=table), DROP_SEARCH_TRIGGER_SQL.format(table=table))
+            for table in SEARCH_TABLES
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='event',
+            index=GinIndex(fields=['search_vector'], name='event_search_gin'),
+        ),
+        AddIndexConcurrently(
+            model_name='opportunity',
+            index=GinIndex(fields=['search_vector'], name='opportunity_search_gin'),
+        ),
+    ]
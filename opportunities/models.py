@@ -1,5 +1,8 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from accounts.vocabulary import normalize_skills
 
 class Opportunity(models.Model):
     STATUS_CHOICES = [
@@ -33,8 +36,28 @@ class Opportunity(models.Model):
     max_volunteers = models.IntegerField(default=1)
     commitment_hours = models.IntegerField(null=True, blank=True, help_text="Hours per week")
     virtual = models.BooleanField(default=False)
+    # Weighted title and description lexemes, maintained by a database trigger
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['required_skills'], name='opportunity_skills_gin'),
+            GinIndex(fields=['search_vector'], name='opportunity_search_gin'),
+            # Listing filters and orderings of OpportunityViewSet
+            models.Index(fields=['status', 'start_date'], name='opp_status_start_idx'),
+            models.Index(fields=['category', 'status'], name='opp_category_status_idx'),
+            models.Index(fields=['organization', 'created_at'], name='opp_org_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.required_skills = normalize_skills(self.required_skills)
+        super().save(*args, **kwargs)
 
 class Event(models.Model):
+    # Maintained with atomic UPDATEs by opportunities.attendance; a plain
+    # save() of a stale instance must never write them back
+    COUNTER_FIELDS = ('attending_count', 'waitlist_sequence')
+
     title = models.CharField(max_length=200)
     description = models.TextField()
     start_time = models.DateTimeField()
@@ -45,13 +68,30 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     max_attendees = models.PositiveIntegerField(default=50)
     waitlist_enabled = models.BooleanField(default=True)
+    # Number of ATTENDING RSVPs, maintained by opportunities.attendance
+    attending_count = models.PositiveIntegerField(default=0, editable=False)
+    # Last waitlist position handed out for this event
+    waitlist_sequence = models.PositiveIntegerField(default=0, editable=False)
+    # Weighted title and description lexemes, maintained by a database trigger
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ['start_time']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='event_search_gin'),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 class RSVP(models.Model):
     RSVP_STATUS = [
         ('REGISTERED', 'Registered'),
@@ -63,8 +103,58 @@ class RSVP(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='rsvps')
     status = models.CharField(max_length=10, choices=RSVP_STATUS, default='REGISTERED')
+    waitlist_position = models.PositiveIntegerField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('user', 'event')
+        indexes = [
+            # Head of an event's waitlist, for promotion
+            models.Index(fields=['event', 'status', 'waitlist_position'], name='rsvp_waitlist_idx'),
+        ]
+
+class Recommendation(models.Model):
+    """Materialized recommendation feed entry for one (volunteer, opportunity) pair.
+
+    Only OPEN opportunities that share a skill or an interest with the
+    volunteer get a row. Maintained by ``opportunities.recommendations``.
+    """
+    volunteer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='recommendations')
+    opportunity = models.ForeignKey(Opportunity, on_delete=models.CASCADE, related_name='recommendations')
+    score = models.FloatField()
+    skill_overlap = models.PositiveIntegerField(default=0)
+    interest_match = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('volunteer', 'opportunity')
+        indexes = [
+            # A volunteer's feed, best first
+            models.Index(fields=['volunteer', '-score'], name='recommendation_feed_idx'),
+        ]
+
+
+class MatchRecord(models.Model):
+    """Ledger of volunteers already matched (and notified) for an opportunity"""
+    opportunity = models.ForeignKey(Opportunity, on_delete=models.CASCADE, related_name='match_records')
+    volunteer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='match_records')
+    matched_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('opportunity', 'volunteer')
+
+
+class OpportunityMatch(models.Model):
+    """Best volunteers for an OPEN opportunity, written by ``opportunities.batch``"""
+    opportunity = models.ForeignKey(Opportunity, on_delete=models.CASCADE, related_name='batch_matches')
+    volunteer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='batch_matches')
+    score = models.FloatField()
+    rank = models.PositiveIntegerField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('opportunity', 'volunteer')
+        indexes = [
+            models.Index(fields=['opportunity', 'rank'], name='opportunity_match_rank_idx'),
+        ]
@@ -0,0 +1,133 @@
+import math
+from django.db import transaction
+from django.db.models import Q
+from accounts.models import User, VolunteerSkill
+from accounts.skill_index import indexed_skills
+from accounts.vocabulary import normalize_skills
+from .models import Opportunity, Recommendation
+
+SKILL_WEIGHT = 2.0
+INTEREST_WEIGHT = 1.0
+# Relevance of an opportunity halves every RECENCY_HALF_LIFE_DAYS of age
+RECENCY_HALF_LIFE_DAYS = 14
+
+_CATEGORY_LOOKUP = {}
+for _code, _label in Opportunity.CATEGORY_CHOICES:
+    _CATEGORY_LOOKUP[_code.lower()] = _code
+    _CATEGORY_LOOKUP[_label.lower()] = _code
+
+
+def interest_categories(interests):
+    """Category codes named by a volunteer's ``interests``, by code or label, case-insensitively"""
+    if not isinstance(interests, list):
+        return set()
+    return {
+        _CATEGORY_LOOKUP[interest.strip().lower()]
+        for interest in interests
+        if isinstance(interest, str) and interest.strip().lower() in _CATEGORY_LOOKUP
+    }
+
+
+def required_skills(opportunity):
+    if not isinstance(opportunity.required_skills, list):
+        return set()
+    return set(normalize_skills(opportunity.required_skills))
+
+
+def recommendation_score(skill_overlap, interest_match, created_at):
+    """
+    Rank key of an opportunity for a volunteer.
+
+    Relevance (weighted skill overlap plus interest match) decays with the
+    age of the opportunity: ``relevance * 2 ** (-age / half_life)``. The
+    stored value is the log2 of that, shifted by the current time, which
+    leaves ``log2(relevance) + created_at / half_life``. That ordering never
+    changes as time passes, so rows only need refreshing when their inputs do.
+    """
+    relevance = SKILL_WEIGHT * skill_overlap + INTEREST_WEIGHT * interest_match
+    return math.log2(relevance) + created_at.timestamp() / (RECENCY_HALF_LIFE_DAYS * 86400)
+
+
+def build_recommendation(skills, categories, opportunity, volunteer_id):
+    """A ``Recommendation`` for the given volunteer inputs, or ``None`` if nothing matches"""
+    skill_overlap = len(skills & required_skills(opportunity))
+    interest_match = opportunity.category in categories
+    if not skill_overlap and not interest_match:
+        return None
+    return Recommendation(
+        volunteer_id=volunteer_id,
+        opportunity_id=opportunity.id,
+        score=recommendation_score(skill_overlap, interest_match, opportunity.created_at),
+        skill_overlap=skill_overlap,
+        interest_match=interest_match,
+    )
+
+
+def _candidate_volunteers(opportunity):
+    """Volunteers sharing a required skill or interested in the category"""
+    # Interests are stored as category labels (see User.save)
+    candidates = Q(interests__contains=[opportunity.get_category_display()])
+    skills = required_skills(opportunity)
+    if skills:
+        candidates |= Q(pk__in=VolunteerSkill.objects.filter(skill__in=skills).values('volunteer_id'))
+    return User.objects.filter(candidates, is_volunteer=True).only('id', 'is_volunteer', 'skills', 'interests')
+
+
+def _opportunity_rows(opportunity, batch_size):
+    for volunteer in _candidate_volunteers(opportunity).iterator(chunk_size=batch_size):
+        row = build_recommendation(
+            indexed_skills(volunteer), interest_categories(volunteer.interests), opportunity, volunteer.id
+        )
+        if row is not None:
+            yield row
+
+
+def refresh_opportunity_recommendations(opportunity_id, batch_size=2000):
+    """Recompute every feed entry of one opportunity; closed or deleted opportunities lose theirs"""
+    with transaction.atomic():
+        Recommendation.objects.filter(opportunity_id=opportunity_id).delete()
+        opportunity = Opportunity.objects.filter(pk=opportunity_id, status='OPEN').first()
+        if opportunity is None:
+            return 0
+        rows = list(_opportunity_rows(opportunity, batch_size))
+        Recommendation.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def refresh_volunteer_recommendations(user_id, batch_size=2000):
+    """Recompute the whole feed of one volunteer from their ``skills`` and ``interests``"""
+    with transaction.atomic():
+        Recommendation.objects.filter(volunteer_id=user_id).delete()
+        user = User.objects.filter(pk=user_id, is_volunteer=True).first()
+        if user is None:
+            return 0
+        skills = indexed_skills(user)
+        categories = interest_categories(user.interests)
+        candidates = Q(category__in=categories)
+        if skills:
+            candidates |= Q(required_skills__has_any_keys=sorted(skills))
+        opportunities = (
+            Opportunity.objects.filter(candidates, status='OPEN')
+            .only('id', 'category', 'required_skills', 'created_at')
+        )
+        rows = [
+            row for row in (
+                build_recommendation(skills, categories, opportunity, user.id)
+                for opportunity in opportunities.iterator(chunk_size=batch_size)
+            )
+            if row is not None
+        ]
+        Recommendation.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def rebuild_recommendations(batch_size=2000):
+    """Rebuild the whole recommendation table from the OPEN opportunities"""
+    total = 0
+    with transaction.atomic():
+        Recommendation.objects.all().delete()
+        for opportunity in Opportunity.objects.filter(status='OPEN').iterator(chunk_size=batch_size):
+            rows = list(_opportunity_rows(opportunity, batch_size))
+            Recommendation.objects.bulk_create(rows, batch_size=batch_size)
+            total += len(rows)
+    return total
@@ -0,0 +1,243 @@
+import heapq
+import math
+import threading
+import time
+from array import array
+from django.conf import settings
+from accounts.models import User
+from accounts.vocabulary import normalize_skills
+from .models import Opportunity
+from .recommendations import interest_categories
+
+DEFAULT_WEIGHTS = {'skills': 0.6, 'interest': 0.2, 'virtual': 0.1, 'commitment': 0.1}
+# Required skill sets up to this size get a precomputed weight for every subset
+SUBSET_TABLE_MAX_SKILLS = 12
+
+CATEGORY_BITS = {code: 1 << position for position, (code, _) in enumerate(Opportunity.CATEGORY_CHOICES)}
+# Codes of the ``virtual`` column
+NO_PREFERENCE, IN_PERSON, VIRTUAL = 0, 1, 2
+# ``hours`` column value of volunteers who did not give their weekly hours
+UNKNOWN_HOURS = -1
+
+VOLUNTEER_FIELDS = ('id', 'skills', 'interests', 'prefers_virtual', 'weekly_hours')
+
+
+def _rank(pair):
+    volunteer_id, score = pair
+    return -score, volunteer_id
+
+
+def matching_weights():
+    return {**DEFAULT_WEIGHTS, **getattr(settings, 'MATCHING_WEIGHTS', {})}
+
+
+class VolunteerMatrix:
+    """
+    Column-oriented snapshot of the matching inputs of every volunteer.
+
+    Skills are interned into bit positions, so a volunteer's skills are one
+    int bitset and the overlap with an opportunity is a single ``&``.
+    Interests are a bitmask of category codes; the virtual preference and
+    weekly hours are small integer codes. Rows are addressed by position;
+    ``positions`` maps volunteer ids to them.
+    """
+
+    def __init__(self, rows=()):
+        self.skill_positions = {}
+        self.document_frequency = []
+        self.positions = {}
+        self.ids = array('q')
+        self.skills = []
+        self.interests = array('l')
+        self.virtual = array('b')
+        self.hours = array('l')
+        self.size = 0
+        for row in rows:
+            self.upsert(*row)
+
+    @classmethod
+    def load(cls, chunk_size=5000):
+        volunteers = User.objects.filter(is_volunteer=True).values_list(*VOLUNTEER_FIELDS)
+        return cls(volunteers.iterator(chunk_size=chunk_size))
+
+    def _skill_bits(self, skills):
+        bits = 0
+        for skill in normalize_skills(skills) if isinstance(skills, list) else ():
+            position = self.skill_positions.get(skill)
+            if position is None:
+                position = self.skill_positions[skill] = len(self.document_frequency)
+                self.document_frequency.append(0)
+            bits |= 1 << position
+        return bits
+
+    def _count_skills(self, bits, delta):
+        while bits:
+            low = bits & -bits
+            self.document_frequency[low.bit_length() - 1] += delta
+            bits ^= low
+
+    def upsert(self, volunteer_id, skills, interests, prefers_virtual, weekly_hours):
+        """Add a volunteer, or replace the row of one already in the matrix"""
+        bits = self._skill_bits(skills)
+        interest_bits = 0
+        for code in interest_categories(interests):
+            interest_bits |= CATEGORY_BITS[code]
+        virtual = NO_PREFERENCE if prefers_virtual is None else VIRTUAL if prefers_virtual else IN_PERSON
+        hours = UNKNOWN_HOURS if weekly_hours is None else weekly_hours
+
+        position = self.positions.get(volunteer_id)
+        if position is None:
+            self.positions[volunteer_id] = len(self.ids)
+            self.ids.append(volunteer_id)
+            self.skills.append(bits)
+            self.interests.append(interest_bits)
+            self.virtual.append(virtual)
+            self.hours.append(hours)
+            self.size += 1
+        else:
+            self._count_skills(self.skills[position], -1)
+            self.skills[position] = bits
+            self.interests[position] = interest_bits
+            self.virtual[position] = virtual
+            self.hours[position] = hours
+        self._count_skills(bits, 1)
+
+    def remove(self, volunteer_id):
+        """Drop a volunteer; the row is left behind empty so it can never match"""
+        position = self.positions.pop(volunteer_id, None)
+        if position is None:
+            return
+        self._count_skills(self.skills[position], -1)
+        self.skills[position] = 0
+        self.interests[position] = 0
+        self.size -= 1
+
+    def skill_weight(self, skill):
+        """Inverse document frequency: rare skills weigh more than common ones"""
+        position = self.skill_positions.get(skill)
+        frequency = self.document_frequency[position] if position is not None else 0
+        return math.log(1 + self.size / max(frequency, 1))
+
+    def score(self, opportunity, weights=None, limit=None, min_score=None):
+        """
+        Score every volunteer that shares a required skill or an interest with
+        ``opportunity``. Returns ``(volunteer_id, score)`` pairs, best first,
+        keeping only scores of at least ``min_score`` and the best ``limit``.
+        """
+        weights = weights or matching_weights()
+        required_skills = normalize_skills(opportunity.required_skills)
+        required_skills = required_skills if isinstance(required_skills, list) else []
+
+        # Skills nobody has still count towards the total, so covering one of
+        # two required skills scores half whether or not the other is known
+        required = {}
+        total_weight = 0.0
+        for skill in required_skills:
+            weight = self.skill_weight(skill)
+            total_weight += weight
+            if skill in self.skill_positions:
+                required[1 << self.skill_positions[skill]] = weight
+        scale = weights['skills'] / total_weight if total_weight else 0.0
+        mask = sum(required)
+
+        if len(required) <= SUBSET_TABLE_MAX_SKILLS:
+            table = {0: 0.0}
+            for bit, weight in required.items():
+                table.update({subset | bit: value + weight * scale for subset, value in list(table.items())})
+            skill_score = table.__getitem__
+        else:
+            def skill_score(bits):
+                return sum(weight for bit, weight in required.items() if bits & bit) * scale
+
+        category_bit = CATEGORY_BITS.get(opportunity.category, 0)
+        virtual_weight = weights['virtual']
+        virtual_scores = {
+            NO_PREFERENCE: virtual_weight,
+            IN_PERSON: 0.0 if opportunity.virtual else virtual_weight,
+            VIRTUAL: virtual_weight if opportunity.virtual else 0.0,
+        }
+        commitment_weight = weights['commitment']
+        needed_hours = opportunity.commitment_hours
+
+        def commitment_score(hours):
+            if not needed_hours or hours == UNKNOWN_HOURS:
+                return commitment_weight
+            return commitment_weight * min(hours / needed_hours, 1.0)
+
+        # Cheap pass over the bitsets to find candidates, full score for those only
+        candidates = {position for position, bits in enumerate(self.skills) if bits & mask} if mask else set()
+        if category_bit:
+            candidates.update(
+                position for position, interests in enumerate(self.interests) if interests & category_bit
+            )
+
+        interest_weight = weights['interest']
+        scores = (
+            (
+                self.ids[position],
+                round(
+                    skill_score(self.skills[position] & mask)
+                    + (interest_weight if self.interests[position] & category_bit else 0.0)
+                    + virtual_scores[self.virtual[position]]
+                    + commitment_score(self.hours[position]),
+                    6,
+                ),
+            )
+            for position in candidates
+        )
+        if min_score is not None:
+            scores = (pair for pair in scores if pair[1] >= min_score)
+        if limit is None:
+            return sorted(scores, key=_rank)
+        # Bounded heap: memory stays O(limit) however many volunteers match
+        return heapq.nsmallest(limit, scores, key=_rank)
+
+
+_matrix = None
+_matrix_loaded_at = 0.0
+_matrix_lock = threading.Lock()
+
+
+def volunteer_matrix():
+    """
+    The process-wide ``VolunteerMatrix``, reloaded every ``MATCHING_MATRIX_TTL``
+    seconds. Profile changes made in this process are applied by
+    ``opportunities.signals`` once they commit; other processes see them
+    after the reload.
+    """
+    global _matrix, _matrix_loaded_at
+    with _matrix_lock:
+        ttl = getattr(settings, 'MATCHING_MATRIX_TTL', 300)
+        if _matrix is None or time.monotonic() - _matrix_loaded_at > ttl:
+            _matrix = VolunteerMatrix.load()
+            _matrix_loaded_at = time.monotonic()
+        return _matrix
+
+
+def score_volunteers(opportunity, limit=None, min_score=None):
+    """
+    ``VolunteerMatrix.score`` against the process-wide matrix, holding the
+    lock so profile updates from other threads cannot change it mid-scan.
+    """
+    matrix = volunteer_matrix()
+    with _matrix_lock:
+        return matrix.score(opportunity, limit=limit, min_score=min_score)
+
+
+def update_volunteer_matrix(row):
+    """Upsert a volunteer given as a ``VOLUNTEER_FIELDS`` tuple"""
+    with _matrix_lock:
+        if _matrix is not None:
+            _matrix.upsert(*row)
+
+
+def remove_from_volunteer_matrix(user_id):
+    with _matrix_lock:
+        if _matrix is not None:
+            _matrix.remove(user_id)
+
+
+def reset_volunteer_matrix():
+    global _matrix
+    with _matrix_lock:
+        _matrix = None
@@ -0,0 +1,91 @@
+import re
+from html import escape
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F
+from .models import Opportunity, Event
+
+# Must match the configuration of the search_vector triggers (migration 0019)
+SEARCH_CONFIG = 'english'
+MAX_SEARCH_TERMS = 8
+# Shorter terms would turn into prefixes matching most of the table; they
+# must match a whole word instead, and single characters are ignored
+MIN_PREFIX_LENGTH = 3
+MIN_TERM_LENGTH = 2
+# Markers ts_headline puts around matches; swapped for <mark> after escaping
+HIGHLIGHT_START, HIGHLIGHT_STOP = '\x02', '\x03'
+SNIPPET_OPTIONS = {'max_words': 35, 'min_words': 15, 'max_fragments': 2, 'fragment_delimiter': ' … '}
+
+# Result type -> (model, field shown as the result's date)
+SEARCH_TYPES = {
+    'opportunity': (Opportunity, 'start_date'),
+    'event': (Event, 'start_time'),
+}
+
+_TERM_RE = re.compile(r'[^\W_]+')
+
+
+def search_query(text):
+    """
+    A query matching documents that contain every term of ``text``, terms of
+    ``MIN_PREFIX_LENGTH`` or more as prefixes: ``"beach clean"`` finds
+    "Beach cleanup". ``None`` if ``text`` has no usable terms. Only letters
+    and digits reach the tsquery, so user input can never produce a
+    malformed query.
+    """
+    terms = [term for term in _TERM_RE.findall(text.lower()) if len(term) >= MIN_TERM_LENGTH][:MAX_SEARCH_TERMS]
+    if not terms:
+        return None
+    return SearchQuery(
+        ' & '.join(f'{term}:*' if len(term) >= MIN_PREFIX_LENGTH else term for term in terms),
+        search_type='raw', config=SEARCH_CONFIG,
+    )
+
+
+def _highlight(text):
+    return escape(text or '').replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>')
+
+
+def _headline(field, query, **options):
+    return SearchHeadline(
+        field, query, config=SEARCH_CONFIG, start_sel=HIGHLIGHT_START, stop_sel=HIGHLIGHT_STOP, **options
+    )
+
+
+def search_documents(result_type, query, limit):
+    """
+    The ``limit`` best matches of ``query`` among one type's documents, as
+    result dicts with highlighted ``title_highlight`` and ``snippet``.
+
+    The GIN index on ``search_vector`` finds the matches. Headlines, which
+    re-parse the text, are built in a second query for the returned rows only.
+    """
+    model, date_field = SEARCH_TYPES[result_type]
+    results = list(
+        model.objects.filter(search_vector=query)
+        .annotate(rank=SearchRank(F('search_vector'), query))
+        .order_by('-rank', 'pk')
+        .values('id', 'title', 'rank', date=F(date_field))[:limit]
+    )
+    headlines = {
+        row_id: (title, snippet)
+        for row_id, title, snippet in model.objects.filter(id__in=[result['id'] for result in results])
+        .annotate(
+            title_highlight=_headline('title', query, highlight_all=True),
+            snippet=_headline('description', query, **SNIPPET_OPTIONS),
+        )
+        .values_list('id', 'title_highlight', 'snippet')
+    }
+    for result in results:
+        title, snippet = headlines[result['id']]
+        result.update(type=result_type, title_highlight=_highlight(title), snippet=_highlight(snippet))
+    return results
+
+
+def search(text, types=tuple(SEARCH_TYPES), limit=20):
+    """Best matches of ``text`` across ``types``, highest rank first"""
+    query = search_query(text)
+    if query is None:
+        return []
+    results = [result for result_type in types for result in search_documents(result_type, query, limit)]
+    results.sort(key=lambda result: -result['rank'])
+    return results[:limit]
@@ -9,8 +9,9 @@ class OpportunitySerializer(serializers.ModelSerializer):
     organization_name = serializers.SerializerMethodField()
     class Meta:
         model = Opportunity
-        fields = '__all__'
+        exclude = ('search_vector',)
         read_only_fields = ('created_at', 'organization')
+        select_related = ('organization',)
 
     def validate(self, data):
         if isinstance(data.get('start_date'), str):
@@ -29,7 +30,16 @@ class OpportunitySerializer(serializers.ModelSerializer):
 
 class MatchResultSerializer(serializers.Serializer):
     volunteer = UserSerializer()
-    match_score = serializers.IntegerField()
+    match_score = serializers.FloatField()
+
+class SearchResultSerializer(serializers.Serializer):
+    type = serializers.CharField()
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    title_highlight = serializers.CharField()
+    snippet = serializers.CharField()
+    date = serializers.DateTimeField()
+    rank = serializers.FloatField()
 
 class EventSerializer(serializers.ModelSerializer):
     available_slots = serializers.SerializerMethodField()
@@ -37,17 +47,20 @@ class EventSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Event
-        fields = '__all__'
-        read_only_fields = ('created_by', 'created_at')
+        exclude = ('search_vector',)
+        read_only_fields = ('created_by', 'created_at', 'attending_count')
     
     def get_available_slots(self, obj):
-        return obj.max_attendees - obj.rsvps.filter(status='ATTENDING').count()
+        return obj.max_attendees - obj.attending_count
         
     def get_attendee_count(self, obj):
-        return obj.rsvps.filter(status='ATTENDING').count()
+        return obj.attending_count
 
     def validate(self, data):
-        if data['start_time'] >= data['end_time']:
+        # Partial updates fall back to the stored times
+        start_time = data.get('start_time', getattr(self.instance, 'start_time', None))
+        end_time = data.get('end_time', getattr(self.instance, 'end_time', None))
+        if start_time >= end_time:
             raise serializers.ValidationError("End time must be after start time")
         return data
 
@@ -55,10 +68,10 @@ class RSVPSerializer(serializers.ModelSerializer):
     class Meta:
         model = RSVP
         fields = '__all__'
-        read_only_fields = ('user', 'created_at', 'updated_at')
+        read_only_fields = ('user', 'status', 'waitlist_position', 'created_at', 'updated_at')
 
     def validate(self, data):
-        event = data['event']
-        if event.start_time < timezone.now():
+        event = data.get('event', getattr(self.instance, 'event', None))
+        if event is not None and event.start_time < timezone.now():
             raise serializers.ValidationError("Cannot RSVP for past events")
         return data
\ No newline at end of file
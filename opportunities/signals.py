@@ -0,0 +1,104 @@
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from accounts.models import User
+from jobs.queue import enqueue
+from .attendance import ATTENDING, adjust_attending_count, lock_event, promote_waitlist
+from .caching import invalidate_on_commit
+from .scoring import VOLUNTEER_FIELDS, remove_from_volunteer_matrix, update_volunteer_matrix
+from .models import Opportunity, Event, RSVP
+
+
+@receiver(pre_delete, sender=RSVP)
+def lock_rsvp_event(sender, instance, **kwargs):
+    # Runs in the delete's transaction, before the RSVP row is locked. Once
+    # the event is ours no promotion can be under way, so the stored status
+    # is the one release_attending_slot must go by
+    lock_event(instance.event_id)
+    stored = RSVP.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+    if stored is not None:
+        instance.status = stored
+
+
+@receiver(post_delete, sender=RSVP)
+def release_attending_slot(sender, instance, **kwargs):
+    # Also runs for cascades, e.g. when the user is deleted. Promoting in the
+    # delete's own transaction hands the slot to the waitlist before any new
+    # admit() can see it free
+    if instance.status == ATTENDING:
+        adjust_attending_count(instance.event_id, -1)
+        promote_waitlist(instance.event_id)
+
+
+@receiver(post_save, sender=Opportunity)
+@receiver(post_delete, sender=Opportunity)
+def invalidate_cached_opportunity(sender, instance, **kwargs):
+    invalidate_on_commit('opportunities', instance.pk)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_cached_event(sender, instance, **kwargs):
+    invalidate_on_commit('events', instance.pk)
+
+
+@receiver(post_save, sender=RSVP)
+@receiver(post_delete, sender=RSVP)
+def invalidate_cached_attendance(sender, instance, **kwargs):
+    # Attendee counts are part of the event payload
+    invalidate_on_commit('events', instance.event_id)
+
+
+# Saves that only touch other fields cannot change recommendations
+RECOMMENDATION_OPPORTUNITY_FIELDS = {'status', 'category', 'required_skills'}
+RECOMMENDATION_VOLUNTEER_FIELDS = {'skills', 'interests', 'is_volunteer'}
+
+
+@receiver(pre_save, sender=Opportunity)
+def remember_recommendation_inputs(sender, instance, **kwargs):
+    instance._previous_recommendation_inputs = None
+    if instance.pk is not None:
+        instance._previous_recommendation_inputs = (
+            Opportunity.objects.filter(pk=instance.pk).values(*RECOMMENDATION_OPPORTUNITY_FIELDS).first()
+        )
+
+
+@receiver(post_save, sender=Opportunity)
+def refresh_opportunity_recommendations(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not RECOMMENDATION_OPPORTUNITY_FIELDS & set(update_fields):
+        return
+    previous = getattr(instance, '_previous_recommendation_inputs', None)
+    if not created and previous == {field: getattr(instance, field) for field in RECOMMENDATION_OPPORTUNITY_FIELDS}:
+        return
+    enqueue('opportunities.recommendations.refresh_opportunity_recommendations', opportunity_id=instance.pk)
+
+
+@receiver(post_save, sender=User)
+def refresh_volunteer_recommendations(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not RECOMMENDATION_VOLUNTEER_FIELDS & set(update_fields):
+        return
+    if created and not instance.is_volunteer:
+        return
+    enqueue('opportunities.recommendations.refresh_volunteer_recommendations', user_id=instance.pk)
+
+
+# Saves that only touch other fields cannot change the volunteer matrix
+MATRIX_FIELDS = set(VOLUNTEER_FIELDS) | {'is_volunteer'}
+
+
+@receiver(post_save, sender=User)
+def update_matching_matrix(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not MATRIX_FIELDS & set(update_fields):
+        return
+    # Applied on commit, so a rolled-back edit never reaches the shared matrix
+    if instance.is_volunteer:
+        row = tuple(getattr(instance, field) for field in VOLUNTEER_FIELDS)
+        transaction.on_commit(partial(update_volunteer_matrix, row))
+    else:
+        transaction.on_commit(partial(remove_from_volunteer_matrix, instance.pk))
+
+
+@receiver(post_delete, sender=User)
+def remove_from_matching_matrix(sender, instance, **kwargs):
+    transaction.on_commit(partial(remove_from_volunteer_matrix, instance.pk))
@@ -1,12 +1,25 @@
 import pytest
 import json
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from datetime import datetime, timedelta
 from accounts.models import User
-from .models import Opportunity, Event, RSVP
+from notifications.models import Notification
+from .models import Opportunity, Event, RSVP, Recommendation, MatchRecord, OpportunityMatch
+from .matching import match_volunteers_to_opportunities
+from .recommendations import recommendation_score
+from .batch import match_open_opportunities
+from .filters import opportunity_filters
+from .search import search_query
+from .attendance import create_rsvp, set_rsvp_status, admit, cancel_rsvp, promote_waitlist, AlreadyRegistered
+from volunteer_bridge.testing import assert_queries_do_not_grow
 from django.utils import timezone
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from .serializers import RSVPSerializer
+from .views import RSVPViewSet
 
 
 @pytest.mark.django_db
@@ -94,7 +107,7 @@ class TestOpportunities:
         # Test that both org and volunteer can list opportunities
         response = vol_client.get(reverse('opportunity-list'))
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) > 0
+        assert len(response.data['results']) > 0
 
     def test_retrieve_opportunity(self, org_client, opportunity_data):
         """Test retrieving a single opportunity"""
@@ -270,7 +283,7 @@ class TestEventSystem:
 
         response = vol_client.get(reverse('event-list'))
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) > 0
+        assert len(response.data['results']) > 0
 
     def test_attend_event(self, vol_client, org_client, event_data):
         response = org_client.post(reverse('event-list'), event_data)
@@ -404,3 +417,781 @@ class TestRSVPSystem:
         assert response.data['status'] == 'WAITLISTED'
 
 
+
+@pytest.mark.django_db
+class TestSkillIndexMatching:
+    @pytest.fixture
+    def organization(self):
+        return User.objects.create_user(username='indexorg', password='testpass123', is_organization=True)
+
+    @pytest.fixture
+    def opportunity(self, organization):
+        return Opportunity.objects.create(
+            title='Index Opportunity',
+            description='Test Description',
+            organization=organization,
+            required_skills=['python', 'django', 'sql'],
+            start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(days=1),
+            location='Remote',
+        )
+
+    def test_scores_come_from_skill_postings(self, opportunity):
+        strong = User.objects.create_user(username='strong', password='x', is_volunteer=True, skills=['python', 'django'])
+        weak = User.objects.create_user(username='weak', password='x', is_volunteer=True, skills=['sql', 'cooking'])
+        User.objects.create_user(username='nomatch', password='x', is_volunteer=True, skills=['cooking'])
+
+        matches = match_volunteers_to_opportunities(opportunity)
+
+        assert [(m['volunteer'], m['match_score']) for m in matches] == [(strong, 2), (weak, 1)]
+
+    def test_index_follows_skill_changes(self, opportunity):
+        volunteer = User.objects.create_user(username='changer', password='x', is_volunteer=True, skills=['cooking'])
+        assert match_volunteers_to_opportunities(opportunity) == []
+
+        volunteer.skills = ['python']
+        volunteer.save()
+        assert [m['volunteer'] for m in match_volunteers_to_opportunities(opportunity)] == [volunteer]
+
+        volunteer.is_volunteer = False
+        volunteer.save()
+        assert match_volunteers_to_opportunities(opportunity) == []
+
+    @pytest.mark.parametrize('backend', ['postings', 'jsonb'])
+    def test_skills_match_case_insensitively(self, settings, organization, backend):
+        settings.MATCHING_BACKEND = backend
+        opportunity = Opportunity.objects.create(
+            title='Mixed case', description='Test', organization=organization,
+            required_skills=['Python', ' DATA  Entry', 'python'],
+            start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1), location='Remote',
+        )
+        volunteer = User.objects.create_user(
+            username='mixed', password='x', is_volunteer=True, skills=['PYTHON', 'data entry'], interests=['edu ']
+        )
+
+        assert opportunity.required_skills == ['python', 'data entry']
+        assert volunteer.skills == ['python', 'data entry']
+        assert volunteer.interests == ['Education']
+        assert [(m['volunteer'], m['match_score']) for m in match_volunteers_to_opportunities(opportunity)] == [(volunteer, 2)]
+
+    @pytest.mark.parametrize('backend', ['postings', 'jsonb'])
+    def test_backends_rank_and_paginate_in_sql(self, settings, opportunity, backend):
+        settings.MATCHING_BACKEND = backend
+        best = User.objects.create_user(username='best', password='x', is_volunteer=True, skills=['python', 'django', 'sql'])
+        good = User.objects.create_user(username='good', password='x', is_volunteer=True, skills=['python', 'sql'])
+        ok = User.objects.create_user(username='ok', password='x', is_volunteer=True, skills=['django'])
+        User.objects.create_user(username='org2', password='x', is_organization=True, skills=['python'])
+
+        matches = match_volunteers_to_opportunities(opportunity)
+        assert [(m['volunteer'], m['match_score']) for m in matches] == [(best, 3), (good, 2), (ok, 1)]
+
+        page = match_volunteers_to_opportunities(opportunity, limit=1, offset=1)
+        assert [(m['volunteer'], m['match_score']) for m in page] == [(good, 2)]
+
+    def test_matches_endpoint_limits_results(self, organization, opportunity):
+        for i in range(3):
+            User.objects.create_user(username=f'vol{i}', password='x', is_volunteer=True, skills=['python'])
+        client = APIClient()
+        client.force_authenticate(user=organization)
+
+        response = client.get(reverse('opportunity-matches', args=[opportunity.id]), {'limit': 2})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 2
+        assert response.data[0]['match_score'] == 1
+        assert response.data[0]['volunteer']['username'] == 'vol0'
+
+    def test_matches_endpoint_filters_by_min_score(self, organization, opportunity):
+        User.objects.create_user(username='two', password='x', is_volunteer=True, skills=['python', 'sql'])
+        User.objects.create_user(username='one', password='x', is_volunteer=True, skills=['python'])
+        client = APIClient()
+        client.force_authenticate(user=organization)
+        url = reverse('opportunity-matches', args=[opportunity.id])
+
+        response = client.get(url, {'min_score': 2})
+        assert [m['volunteer']['username'] for m in response.data] == ['two']
+        assert client.get(url, {'min_score': 'high'}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_matches_notify_each_volunteer_once(self, settings, organization, opportunity,
+                                                django_capture_on_commit_callbacks):
+        settings.JOBS_BACKEND = 'immediate'
+        first = User.objects.create_user(username='first', password='x', is_volunteer=True, skills=['python'])
+        client = APIClient()
+        client.force_authenticate(user=organization)
+        url = reverse('opportunity-matches', args=[opportunity.id])
+
+        with django_capture_on_commit_callbacks(execute=True):
+            client.get(url)
+        with django_capture_on_commit_callbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        assert not [query for query in queries if query['sql'].startswith('INSERT')]
+
+        second = User.objects.create_user(username='second', password='x', is_volunteer=True, skills=['sql'])
+        with django_capture_on_commit_callbacks(execute=True):
+            client.get(url)
+
+        assert sorted(Notification.objects.values_list('user__username', flat=True)) == ['first', 'second']
+        assert set(MatchRecord.objects.values_list('volunteer', flat=True)) == {first.id, second.id}
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    @pytest.fixture
+    def org_client(self):
+        organization = User.objects.create_user(username='pageorg', password='testpass123', is_organization=True)
+        client = APIClient()
+        client.force_authenticate(user=organization)
+        return client, organization
+
+    def test_opportunity_pages_follow_created_at(self, org_client):
+        client, organization = org_client
+        for i in range(5):
+            Opportunity.objects.create(
+                title=f'Opportunity {i}', description='Test', organization=organization,
+                required_skills=[], start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1),
+                location='Remote',
+            )
+
+        first = client.get(reverse('opportunity-list'), {'page_size': 2})
+        assert [o['title'] for o in first.data['results']] == ['Opportunity 4', 'Opportunity 3']
+
+        second = client.get(first.data['next'])
+        assert [o['title'] for o in second.data['results']] == ['Opportunity 2', 'Opportunity 1']
+
+        last = client.get(second.data['next'])
+        assert [o['title'] for o in last.data['results']] == ['Opportunity 0']
+        assert last.data['next'] is None
+
+    def test_invalid_cursor_is_rejected(self, org_client):
+        client, _ = org_client
+        response = client.get(reverse('opportunity-list'), {'cursor': 'garbage'})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+@pytest.mark.django_db
+class TestQueryPlanning:
+    def test_opportunity_list_queries_do_not_grow(self, django_capture_on_commit_callbacks):
+        client = APIClient()
+        volunteer = User.objects.create_user(username='planvol', password='testpass123', is_volunteer=True)
+        client.force_authenticate(user=volunteer)
+
+        def add_opportunity():
+            organization = User.objects.create_user(
+                username=f'planorg{Opportunity.objects.count()}', password='testpass123', is_organization=True
+            )
+            Opportunity.objects.create(
+                title='Planned', description='Test', organization=organization, required_skills=[],
+                start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1), location='Remote',
+            )
+
+        add_opportunity()
+        def add_opportunities():
+            # Committing invalidates the cached listing
+            with django_capture_on_commit_callbacks(execute=True):
+                for _ in range(3):
+                    add_opportunity()
+
+        assert_queries_do_not_grow(client, reverse('opportunity-list'), add_opportunities)
+
+@pytest.mark.django_db
+class TestAttendingCount:
+    @pytest.fixture
+    def organization(self):
+        return User.objects.create_user(username='countorg', password='testpass123', is_organization=True)
+
+    def make_event(self, organization, **kwargs):
+        return Event.objects.create(
+            title='Counted', description='Test', created_by=organization, location='Here',
+            start_time=timezone.now() + timedelta(days=1), end_time=timezone.now() + timedelta(days=1, hours=2),
+            **kwargs
+        )
+
+    def test_count_follows_rsvp_transitions(self, organization):
+        event = self.make_event(organization)
+        volunteer = User.objects.create_user(username='counted', password='x', is_volunteer=True)
+
+        rsvp = create_rsvp(volunteer, event, 'ATTENDING')
+        event.refresh_from_db()
+        assert event.attending_count == 1
+
+        set_rsvp_status(rsvp, 'CANCELLED')
+        event.refresh_from_db()
+        assert event.attending_count == 0
+
+        set_rsvp_status(rsvp, 'ATTENDING')
+        rsvp.delete()
+        event.refresh_from_db()
+        assert event.attending_count == 0
+
+    def test_event_list_uses_stored_counts(self, organization, django_capture_on_commit_callbacks):
+        client = APIClient()
+        client.force_authenticate(user=organization)
+
+        def add_event():
+            event = self.make_event(organization, max_attendees=3)
+            volunteer = User.objects.create_user(username=f'attendee{RSVP.objects.count()}', password='x')
+            create_rsvp(volunteer, event, 'ATTENDING')
+
+        add_event()
+        def add_events():
+            # Committing invalidates the cached listing
+            with django_capture_on_commit_callbacks(execute=True):
+                for _ in range(3):
+                    add_event()
+
+        assert_queries_do_not_grow(client, reverse('event-list'), add_events, max_queries=1)
+        item = client.get(reverse('event-list')).data['results'][0]
+        assert (item['attendee_count'], item['available_slots']) == (1, 2)
+
+    def test_rsvps_cannot_be_moved_between_events(self, organization):
+        full = self.make_event(organization, max_attendees=1)
+        volunteer = User.objects.create_user(username='mover', password='x', is_volunteer=True)
+        rsvp = create_rsvp(volunteer, self.make_event(organization), 'ATTENDING')
+        create_rsvp(organization, full, 'ATTENDING')
+        view = RSVPViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update'})
+
+        for method in ('put', 'patch'):
+            request = getattr(APIRequestFactory(), method)('/', {'event': full.id}, format='json')
+            force_authenticate(request, user=volunteer)
+            assert view(request, pk=rsvp.pk).status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+        # Partial data without an event validates against the stored one
+        assert RSVPSerializer(rsvp, data={}, partial=True).is_valid()
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentAdmission:
+    def test_concurrent_rsvps_never_oversubscribe(self):
+        organization = User.objects.create_user(username='surgeorg', password='x', is_organization=True)
+        event = Event.objects.create(
+            title='Ticket drop', description='Test', created_by=organization, location='Here', max_attendees=5,
+            start_time=timezone.now() + timedelta(days=1), end_time=timezone.now() + timedelta(days=1, hours=2),
+        )
+        volunteers = [User.objects.create_user(username=f'surge{i}', password='x') for i in range(30)]
+
+        def rsvp(volunteer):
+            try:
+                return admit(volunteer, event).status
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=15) as pool:
+            outcomes = list(pool.map(rsvp, volunteers))
+
+        event.refresh_from_db()
+        assert outcomes.count('ATTENDING') == event.attending_count == 5
+        positions = sorted(RSVP.objects.filter(event=event, status='WAITLISTED').values_list('waitlist_position', flat=True))
+        assert positions == list(range(1, 26))
+
+    def test_duplicate_rsvp_releases_its_slot(self):
+        organization = User.objects.create_user(username='duporg', password='x', is_organization=True)
+        volunteer = User.objects.create_user(username='dupvol', password='x')
+        event = Event.objects.create(
+            title='Once', description='Test', created_by=organization, location='Here', max_attendees=5,
+            start_time=timezone.now() + timedelta(days=1), end_time=timezone.now() + timedelta(days=1, hours=2),
+        )
+        admit(volunteer, event)
+        with pytest.raises(AlreadyRegistered):
+            admit(volunteer, event)
+        event.refresh_from_db()
+        assert event.attending_count == 1
+
+    def test_concurrent_cancellations_do_not_deadlock(self):
+        organization = User.objects.create_user(username='leaveorg', password='x', is_organization=True)
+        event = Event.objects.create(
+            title='Rained out', description='Test', created_by=organization, location='Here', max_attendees=3,
+            start_time=timezone.now() + timedelta(days=1), end_time=timezone.now() + timedelta(days=1, hours=2),
+        )
+        rsvps = [admit(User.objects.create_user(username=f'leaving{i}', password='x'), event) for i in range(12)]
+
+        def leave(rsvp):
+            try:
+                # Attendees and waitlisted users alike, by cancelling or deleting
+                rsvp.delete() if rsvp.pk % 2 else cancel_rsvp(rsvp)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=12) as pool:
+            list(pool.map(leave, rsvps))
+
+        event.refresh_from_db()
+        assert event.attending_count == 0
+        assert not RSVP.objects.filter(event=event).exclude(status='CANCELLED').exists()
+
+@pytest.mark.django_db
+class TestWaitlistPromotion:
+    @pytest.fixture
+    def organization(self):
+        return User.objects.create_user(username='promoorg', password='testpass123', is_organization=True)
+
+    @pytest.fixture
+    def event(self, organization):
+        return Event.objects.create(
+            title='Promotions', description='Test', created_by=organization, location='Here', max_attendees=2,
+            start_time=timezone.now() + timedelta(days=1), end_time=timezone.now() + timedelta(days=1, hours=2),
+        )
+
+    @pytest.fixture
+    def rsvps(self, event):
+        volunteers = [User.objects.create_user(username=f'queued{i}', password='x') for i in range(5)]
+        return [admit(volunteer, event) for volunteer in volunteers]
+
+    def statuses(self, rsvps):
+        return [RSVP.objects.get(pk=rsvp.pk).status for rsvp in rsvps]
+
+    def test_cancellation_promotes_head_of_waitlist(self, event, rsvps):
+        cancel_rsvp(rsvps[0])
+
+        assert self.statuses(rsvps) == ['CANCELLED', 'ATTENDING', 'ATTENDING', 'WAITLISTED', 'WAITLISTED']
+        event.refresh_from_db()
+        assert event.attending_count == 2
+
+    def test_deleted_rsvp_slot_goes_to_waitlist_first(self, event, rsvps):
+        rsvps[0].delete()
+        newcomer = admit(User.objects.create_user(username='latecomer', password='x'), event)
+
+        assert self.statuses(rsvps[1:]) == ['ATTENDING', 'ATTENDING', 'WAITLISTED', 'WAITLISTED']
+        assert newcomer.status == 'WAITLISTED'
+
+    def test_capacity_increase_promotes_in_fifo_order(self, organization, event, rsvps):
+        client = APIClient()
+        client.force_authenticate(user=organization)
+
+        response = client.patch(reverse('event-detail', args=[event.id]), {'max_attendees': 4})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['attendee_count'] == 4
+        assert self.statuses(rsvps) == ['ATTENDING', 'ATTENDING', 'ATTENDING', 'ATTENDING', 'WAITLISTED']
+
+    def test_cancel_rsvp_endpoint(self, event, rsvps):
+        client = APIClient()
+        client.force_authenticate(user=rsvps[1].user)
+
+        response = client.post(reverse('event-cancel-rsvp', args=[event.id]))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['status'] == 'CANCELLED'
+        assert self.statuses(rsvps)[2] == 'ATTENDING'
+
+    def test_rsvp_again_after_cancelling(self, event, rsvps):
+        client = APIClient()
+        client.force_authenticate(user=rsvps[0].user)
+
+        assert client.post(reverse('event-cancel-rsvp', args=[event.id])).status_code == status.HTTP_200_OK
+        response = client.post(reverse('event-rsvp', args=[event.id]))
+
+        # Back on the same row, at the end of the waitlist
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['status'] == 'WAITLISTED'
+        assert RSVP.objects.filter(user=rsvps[0].user, event=event).count() == 1
+        cancel_rsvp(rsvps[1])
+        cancel_rsvp(rsvps[2])
+        cancel_rsvp(rsvps[3])
+        assert self.statuses(rsvps) == ['ATTENDING', 'CANCELLED', 'CANCELLED', 'CANCELLED', 'ATTENDING']
+        event.refresh_from_db()
+        assert event.attending_count == 2
+
+    def test_every_promotion_is_notified(self, settings, event, rsvps, django_capture_on_commit_callbacks):
+        settings.JOBS_BACKEND = 'immediate'
+        with django_capture_on_commit_callbacks(execute=True):
+            cancel_rsvp(rsvps[0])
+            # Back onto an otherwise empty waitlist and promoted once more
+            for rsvp in rsvps[3:]:
+                set_rsvp_status(rsvp, 'CANCELLED')
+            set_rsvp_status(rsvps[2], 'WAITLISTED')
+            promote_waitlist(event.id)
+
+        promoted = Notification.objects.filter(user=rsvps[2].user, message__startswith='A spot opened up')
+        assert promoted.count() == 2
+
+@pytest.mark.django_db
+class TestListingCache:
+    @pytest.fixture
+    def organization(self):
+        return User.objects.create_user(username='cacheorg', password='testpass123', is_organization=True)
+
+    @pytest.fixture
+    def client(self, organization):
+        client = APIClient()
+        client.force_authenticate(user=organization)
+        return client
+
+    def make_opportunity(self, organization, title):
+        return Opportunity.objects.create(
+            title=title, description='Test', organization=organization, required_skills=[],
+            start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1), location='Remote',
+        )
+
+    def test_repeated_reads_skip_the_orm_and_honour_etags(self, client, organization, django_assert_num_queries):
+        self.make_opportunity(organization, 'Cached')
+        url = reverse('opportunity-list')
+        first = client.get(url)
+
+        with django_assert_num_queries(0):
+            second = client.get(url)
+            not_modified = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        assert second.content == first.content
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not_modified.content == b''
+
+    def test_saves_invalidate_lists_and_details(self, client, organization, django_capture_on_commit_callbacks):
+        opportunity = self.make_opportunity(organization, 'Before')
+        client.get(reverse('opportunity-list'))
+        client.get(reverse('opportunity-detail', args=[opportunity.id]))
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            opportunity.title = 'After'
+            opportunity.save()
+            self.make_opportunity(organization, 'New')
+        # Nothing is invalidated before the writes commit
+        assert client.get(reverse('opportunity-detail', args=[opportunity.id])).json()['title'] == 'Before'
+        for callback in callbacks:
+            callback()
+
+        titles = [o['title'] for o in client.get(reverse('opportunity-list')).json()['results']]
+        assert titles == ['New', 'After']
+        assert client.get(reverse('opportunity-detail', args=[opportunity.id])).json()['title'] == 'After'
+
+    def test_rsvps_invalidate_event_listings(self, client, organization, django_capture_on_commit_callbacks):
+        event = Event.objects.create(
+            title='Cached event', description='Test', created_by=organization, location='Here', max_attendees=3,
+            start_time=timezone.now() + timedelta(days=1), end_time=timezone.now() + timedelta(days=1, hours=2),
+        )
+        assert client.get(reverse('event-list')).json()['results'][0]['attendee_count'] == 0
+
+        with django_capture_on_commit_callbacks(execute=True):
+            admit(User.objects.create_user(username='cachevol', password='x'), event)
+
+        assert client.get(reverse('event-list')).json()['results'][0]['attendee_count'] == 1
+
+@pytest.mark.django_db
+class TestRecommendations:
+    @pytest.fixture(autouse=True)
+    def immediate_jobs(self, settings):
+        settings.JOBS_BACKEND = 'immediate'
+
+    @pytest.fixture
+    def organization(self):
+        return User.objects.create_user(username='recorg', password='testpass123', is_organization=True)
+
+    def make_opportunity(self, organization, title, **kwargs):
+        kwargs.setdefault('required_skills', [])
+        return Opportunity.objects.create(
+            title=title, description='Test', organization=organization,
+            start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1), location='Remote', **kwargs
+        )
+
+    def feed(self, volunteer):
+        client = APIClient()
+        client.force_authenticate(user=volunteer)
+        response = client.get(reverse('recommended_opportunities'))
+        assert response.status_code == status.HTTP_200_OK
+        return [opportunity['title'] for opportunity in response.data]
+
+    def test_feed_ranks_open_matches(self, organization, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            self.make_opportunity(organization, 'Two skills', required_skills=['python', 'sql'])
+            self.make_opportunity(organization, 'One skill', required_skills=['python'])
+            self.make_opportunity(organization, 'Interest', category='EDU')
+            self.make_opportunity(organization, 'Closed', required_skills=['python', 'sql'], status='FILLED')
+            self.make_opportunity(organization, 'Unrelated', required_skills=['cooking'], category='ANI')
+            volunteer = User.objects.create_user(
+                username='recvol', password='x', is_volunteer=True, skills=['python', 'sql'], interests=['education'],
+            )
+
+        assert self.feed(volunteer) == ['Two skills', 'One skill', 'Interest']
+
+    def test_unrelated_opportunity_edits_skip_the_refresh(self, organization, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            opportunity = self.make_opportunity(organization, 'Edited', required_skills=['python'])
+
+        with CaptureQueriesContext(connection) as queries, django_capture_on_commit_callbacks(execute=True):
+            opportunity.title = 'Renamed'
+            opportunity.required_skills = ['Python ']  # the same skill once normalized
+            opportunity.save()
+        assert not [q for q in queries if Recommendation._meta.db_table in q['sql']]
+
+        with CaptureQueriesContext(connection) as queries, django_capture_on_commit_callbacks(execute=True):
+            opportunity.category = 'EDU'
+            opportunity.save()
+        assert [q for q in queries if Recommendation._meta.db_table in q['sql']]
+
+    def test_feed_follows_profile_and_opportunity_changes(self, organization, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            volunteer = User.objects.create_user(username='recvol', password='x', is_volunteer=True, skills=[], interests=[])
+            opportunity = self.make_opportunity(organization, 'Health', category='HEA')
+            self.make_opportunity(organization, 'Newest', category='OTH')
+        assert self.feed(volunteer) == ['Newest', 'Health']  # no matches: recent opportunities
+
+        with django_capture_on_commit_callbacks(execute=True):
+            volunteer.interests = ['Health']
+            volunteer.save()
+        assert self.feed(volunteer) == ['Health']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            opportunity.status = 'CANCELLED'
+            opportunity.save()
+        assert not Recommendation.objects.filter(volunteer=volunteer).exists()
+
+    def test_newer_opportunities_win_ties(self):
+        now = timezone.now()
+        assert recommendation_score(1, False, now) > recommendation_score(1, False, now - timedelta(days=1))
+        # A much better match outranks a slightly newer one
+        assert recommendation_score(3, False, now - timedelta(days=1)) > recommendation_score(1, False, now)
+
+@pytest.mark.django_db
+class TestWeightedMatching:
+    @pytest.fixture(autouse=True)
+    def weighted_backend(self, settings):
+        settings.MATCHING_BACKEND = 'weighted'
+        settings.MATCHING_WEIGHTS = {'skills': 0.6, 'interest': 0.2, 'virtual': 0.1, 'commitment': 0.1}
+
+    @pytest.fixture
+    def organization(self):
+        return User.objects.create_user(username='weightorg', password='testpass123', is_organization=True)
+
+    def make_opportunity(self, organization, **kwargs):
+        kwargs.setdefault('required_skills', [])
+        return Opportunity.objects.create(
+            title='Weighted', description='Test', organization=organization,
+            start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1), location='Remote', **kwargs
+        )
+
+    def ranking(self, opportunity, **kwargs):
+        return [(m['volunteer'].username, m['match_score'])
+                for m in match_volunteers_to_opportunities(opportunity, **kwargs)]
+
+    def test_rare_skills_weigh_more(self, organization):
+        for i in range(3):
+            User.objects.create_user(username=f'common{i}', password='x', is_volunteer=True, skills=['python'])
+        User.objects.create_user(username='rare', password='x', is_volunteer=True, skills=['welding'])
+        opportunity = self.make_opportunity(organization, required_skills=['python', 'welding'])
+
+        ranking = self.ranking(opportunity)
+
+        assert [username for username, _ in ranking] == ['rare', 'common0', 'common1', 'common2']
+        assert ranking[0][1] > ranking[1][1]
+
+    def test_interest_virtual_and_commitment_factors(self, organization):
+        opportunity = self.make_opportunity(organization, category='EDU', virtual=True, commitment_hours=10)
+        User.objects.create_user(username='fits', password='x', is_volunteer=True, interests=['Education'],
+                                 prefers_virtual=True, weekly_hours=10)
+        User.objects.create_user(username='part_time', password='x', is_volunteer=True, interests=['Education'],
+                                 prefers_virtual=True, weekly_hours=5)
+        User.objects.create_user(username='in_person', password='x', is_volunteer=True, interests=['Education'],
+                                 prefers_virtual=False, weekly_hours=10)
+        User.objects.create_user(username='uninterested', password='x', is_volunteer=True, interests=['Animals'],
+                                 prefers_virtual=True, weekly_hours=10)
+
+        assert self.ranking(opportunity) == [('fits', 0.4), ('part_time', 0.35), ('in_person', 0.3)]
+
+    def test_matrix_follows_committed_profile_changes(self, organization, django_capture_on_commit_callbacks):
+        volunteer = User.objects.create_user(username='changer', password='x', is_volunteer=True, skills=['python'])
+        opportunity = self.make_opportunity(organization, required_skills=['django'])
+        assert self.ranking(opportunity) == []
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            volunteer.skills = ['Django']
+            volunteer.save()
+        # Not applied until the edit commits
+        assert self.ranking(opportunity) == []
+        for callback in callbacks:
+            callback()
+        assert [username for username, _ in self.ranking(opportunity)] == ['changer']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            volunteer.delete()
+        assert self.ranking(opportunity) == []
+
+    def test_top_k_keeps_only_the_best(self, organization, django_assert_num_queries):
+        for hours in (2, 4, 6, 8, 10):
+            User.objects.create_user(username=f'h{hours}', password='x', is_volunteer=True,
+                                     interests=['Arts'], weekly_hours=hours)
+        opportunity = self.make_opportunity(organization, category='ART', commitment_hours=10)
+        match_volunteers_to_opportunities(opportunity)  # load the matrix
+
+        # Only the page of winners is loaded from the database
+        with django_assert_num_queries(1):
+            top = self.ranking(opportunity, limit=2, offset=1, min_score=0.37)
+        assert top == [('h8', 0.38)]
+        assert self.ranking(opportunity, limit=2) == [('h10', 0.4), ('h8', 0.38)]
+
+@pytest.mark.django_db
+class TestBatchMatching:
+    @pytest.fixture
+    def opportunities(self):
+        organization = User.objects.create_user(username='batchorg', password='x', is_organization=True)
+        for i, skill in enumerate(['python', 'sql', 'python', 'welding']):
+            Opportunity.objects.create(
+                title=f'Batch {i}', description='Test', organization=organization, required_skills=[skill],
+                start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1), location='Remote',
+            )
+        Opportunity.objects.create(
+            title='Closed', description='Test', organization=organization, required_skills=['python'],
+            status='FILLED', start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1), location='Remote',
+        )
+        for i in range(3):
+            User.objects.create_user(username=f'batchvol{i}', password='x', is_volunteer=True, skills=['python', 'sql'])
+
+    def stored(self):
+        return sorted(OpportunityMatch.objects.values_list('opportunity__title', 'rank', 'volunteer__username'))
+
+    @pytest.mark.parametrize('processes', [1, 2])
+    def test_stores_top_volunteers_of_open_opportunities(self, opportunities, processes):
+        stats = match_open_opportunities(top=2, processes=processes, chunk_size=1)
+
+        assert stats['opportunities'] == 4
+        assert stats['matches'] == 6
+        assert self.stored() == [
+            ('Batch 0', 1, 'batchvol0'), ('Batch 0', 2, 'batchvol1'),
+            ('Batch 1', 1, 'batchvol0'), ('Batch 1', 2, 'batchvol1'),
+            ('Batch 2', 1, 'batchvol0'), ('Batch 2', 2, 'batchvol1'),
+        ]
+
+    def test_reruns_replace_previous_results(self, opportunities):
+        match_open_opportunities(top=3)
+        Opportunity.objects.filter(title='Batch 0').update(status='CANCELLED')
+        match_open_opportunities(top=1)
+
+        assert self.stored() == [('Batch 1', 1, 'batchvol0'), ('Batch 2', 1, 'batchvol0')]
+
+
+@pytest.mark.django_db
+class TestOpportunityFilters:
+    @pytest.fixture
+    def client(self):
+        organization = User.objects.create_user(username='filterorg', password='testpass123', is_organization=True)
+        other = User.objects.create_user(username='filterother', password='testpass123', is_organization=True)
+        day = timezone.make_aware(datetime(2025, 6, 10, 12))
+        for title, org, category, status_, virtual, location, days in [
+            ('Beach cleanup', organization, 'ENV', 'OPEN', False, 'Santa Monica', 0),
+            ('Tutoring', organization, 'EDU', 'OPEN', True, 'Remote', 2),
+            ('Park cleanup', other, 'ENV', 'FILLED', False, 'Monterey Park', 5),
+            ('Food bank', other, 'COM', 'OPEN', False, 'Oakland', 9),
+        ]:
+            Opportunity.objects.create(
+                title=title, description='Test', organization=org, required_skills=[], category=category,
+                status=status_, virtual=virtual, location=location,
+                start_date=day + timedelta(days=days), end_date=day + timedelta(days=days, hours=3),
+            )
+        client = APIClient()
+        client.force_authenticate(user=organization)
+        return client
+
+    def titles(self, client, **params):
+        response = client.get(reverse('opportunity-list'), params)
+        assert response.status_code == status.HTTP_200_OK
+        return [o['title'] for o in response.data['results']]
+
+    def test_filters_and_ordering(self, client):
+        assert self.titles(client, category='env', ordering='start_date') == ['Beach cleanup', 'Park cleanup']
+        assert self.titles(client, status='OPEN,FILLED', virtual='false', ordering='-start_date') == [
+            'Food bank', 'Park cleanup', 'Beach cleanup',
+        ]
+        assert self.titles(client, location='park') == ['Park cleanup']
+        assert self.titles(client, organization=User.objects.get(username='filterother').id, ordering='start_date') == [
+            'Park cleanup', 'Food bank',
+        ]
+        assert self.titles(client, **{'from': '2025-06-12', 'to': '2025-06-15', 'ordering': 'start_date'}) == [
+            'Tutoring', 'Park cleanup',
+        ]
+
+    def test_ordering_follows_pagination(self, client):
+        first = client.get(reverse('opportunity-list'), {'ordering': 'start_date', 'page_size': 3})
+        second = client.get(first.data['next'])
+        assert [o['title'] for o in second.data['results']] == ['Food bank']
+
+    def test_invalid_filters_are_rejected(self, client):
+        for params in ({'status': 'ARCHIVED'}, {'virtual': 'maybe'}, {'from': 'June'}, {'ordering': 'title'}):
+            response = client.get(reverse('opportunity-list'), params)
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize('params, ordering, index', [
+        ({'status': 'OPEN', 'from': '2025-06-01'}, 'start_date', 'opp_status_start_idx'),
+        ({'category': 'ENV', 'status': 'OPEN'}, '-created_at', 'opp_category_status_idx'),
+        ({'organization': '1'}, '-created_at', 'opp_org_created_idx'),
+    ])
+    def test_common_filters_use_their_index(self, client, params, ordering, index):
+        # The test tables are tiny; keep the planner off sequential scans so
+        # the plan shows which index the filters can use at any table size
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        field = ordering.lstrip('-')
+        direction = '-' if ordering.startswith('-') else ''
+        queryset = Opportunity.objects.filter(**opportunity_filters(params)).order_by(direction + field, direction + 'pk')
+
+        assert index in queryset.explain()
+
+
+@pytest.mark.django_db
+class TestFullTextSearch:
+    @pytest.fixture
+    def client(self):
+        organization = User.objects.create_user(username='searchorg', password='testpass123', is_organization=True)
+        for title, description in [
+            ('Beach cleanup', 'Collect litter along the shore.'),
+            ('Library volunteers', 'Shelve books & help with the <b>cleanup</b> after the book fair.'),
+            ('Food bank shifts', 'Sort donations for families.'),
+        ]:
+            Opportunity.objects.create(
+                title=title, description=description, organization=organization, required_skills=[],
+                location='Here', start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1),
+            )
+        Event.objects.create(
+            title='Cleanup kickoff', description='Meet the beach crews.', created_by=organization, location='Here',
+            start_time=timezone.now() + timedelta(days=1), end_time=timezone.now() + timedelta(days=1, hours=2),
+        )
+        client = APIClient()
+        client.force_authenticate(user=organization)
+        return client
+
+    def search(self, client, **params):
+        response = client.get(reverse('search_listings'), params)
+        assert response.status_code == status.HTTP_200_OK
+        return response.data['results']
+
+    def test_ranked_prefix_matches_with_highlights(self, client):
+        results = self.search(client, q='clean')
+
+        # Title matches outrank description matches
+        assert [(r['type'], r['title']) for r in results][-1] == ('opportunity', 'Library volunteers')
+        assert {(r['type'], r['title']) for r in results[:2]} == {
+            ('opportunity', 'Beach cleanup'), ('event', 'Cleanup kickoff'),
+        }
+        beach = next(r for r in results if r['title'] == 'Beach cleanup')
+        assert beach['title_highlight'] == 'Beach <mark>cleanup</mark>'
+        library = results[-1]
+        # Only the highlight markup is HTML; the stored text is escaped
+        assert 'books &amp; help' in library['snippet']
+        assert '<b>' not in library['snippet']
+        assert '<mark>cleanup</mark>' in library['snippet']
+
+    def test_every_term_must_match(self, client):
+        assert [r['title'] for r in self.search(client, q='beach clean', type='opportunity')] == ['Beach cleanup']
+        assert [r['title'] for r in self.search(client, q='beach', type='event')] == ['Cleanup kickoff']
+        assert self.search(client, q='clean gardening') == []
+
+    def test_short_terms_are_not_prefixes(self, client):
+        assert self.search(client, q='cl') == []
+        assert len(self.search(client, q='cle')) == 3
+        # Single characters are ignored rather than matching nearly everything
+        assert self.search(client, q='b') == []
+        assert [r['title'] for r in self.search(client, q='b beach', type='event')] == ['Cleanup kickoff']
+        assert search_query('a b') is None
+        assert search_query('be cle') == search_query('be   cle')
+
+    def test_vectors_follow_updates(self, client):
+        Opportunity.objects.filter(title='Food bank shifts').update(description='Pantry cleanup crew')
+        opportunity = Opportunity.objects.get(title='Beach cleanup')
+        opportunity.title = 'Shoreline day'
+        opportunity.save()
+
+        titles = [r['title'] for r in self.search(client, q='cleanup', type='opportunity')]
+        assert sorted(titles) == ['Food bank shifts', 'Library volunteers']
+
+    def test_matches_use_the_gin_index(self, client):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        for model, index in ((Opportunity, 'opportunity_search_gin'), (Event, 'event_search_gin')):
+            assert index in model.objects.filter(search_vector=search_query('beach clean')).explain()
+
+    def test_invalid_queries_are_rejected(self, client):
+        assert client.get(reverse('search_listings')).status_code == status.HTTP_400_BAD_REQUEST
+        assert client.get(reverse('search_listings'), {'q': 'x', 'type': 'user'}).status_code == 400
+        assert self.search(client, q="'&!:*") == []
@@ -7,7 +7,9 @@ router.register(r'opportunities', views.OpportunityViewSet)
 router.register(r'events', views.EventViewSet, basename='event')
 
 urlpatterns = [
-    path('', include(router.urls)),
+    # Ahead of the router, whose opportunities/<pk>/ route would shadow them
     path('opportunities/organization/', views.organization_opportunities, name='organization_opportunities'),
     path('opportunities/recommended/', views.recommended_opportunities, name='recommended_opportunities'),
+    path('search/', views.search_listings, name='search_listings'),
+    path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,21 +1,52 @@
 from rest_framework import viewsets, permissions, status
-from django.db.models import Q
 from rest_framework.response import Response
-from .models import Opportunity, Event, RSVP
+from .models import Opportunity, Event, RSVP, Recommendation
 from rest_framework.decorators import action, api_view, permission_classes
-from .serializers import OpportunitySerializer, EventSerializer, RSVPSerializer
+from .serializers import (
+    OpportunitySerializer, EventSerializer, RSVPSerializer, MatchResultSerializer, SearchResultSerializer,
+)
 from rest_framework.exceptions import ValidationError
 from accounts.permissions import IsOrganization
 from rest_framework.permissions import IsAuthenticated
-from .matching import match_volunteers_to_opportunities
-from notifications.utils import create_notification
+from .matching import match_volunteers_to_opportunities, record_matches
+from .attendance import admit, cancel_rsvp, promote_waitlist, EventFull, AlreadyRegistered
+from .caching import CachedResponseMixin
+from .filters import opportunity_filters, opportunity_ordering
+from .search import SEARCH_TYPES, search
+from jobs.queue import enqueue
+from notifications.utils import create_broadcast
 from django.contrib.auth import get_user_model
+from volunteer_bridge.query_planning import QueryPlanMixin, plan_queryset
 
 User = get_user_model()
 
-class OpportunityViewSet(viewsets.ModelViewSet):
+MATCHES_DEFAULT_LIMIT = 50
+MATCHES_MAX_LIMIT = 200
+RECOMMENDATIONS_LIMIT = 6
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 50
+
+def _int_param(request, name, default, maximum=None):
+    try:
+        value = max(int(request.query_params.get(name, default)), 0)
+    except (TypeError, ValueError):
+        raise ValidationError({name: "Must be an integer"})
+    return min(value, maximum) if maximum is not None else value
+
+def _float_param(request, name):
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValidationError({name: "Must be a number"})
+
+class OpportunityViewSet(QueryPlanMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Opportunity.objects.all()
     serializer_class = OpportunitySerializer
+    ordering = '-created_at'
+    cache_resource = 'opportunities'
     
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
@@ -23,19 +54,30 @@ class OpportunityViewSet(viewsets.ModelViewSet):
         else:
             permission_classes = [permissions.IsAuthenticated]
         return [permission() for permission in permission_classes]
+
+    def filter_queryset(self, queryset):
+        """
+        Apply the listing filters of ``opportunity_filters`` and an optional
+        ``?ordering=`` (e.g. ``start_date``), which the pagination follows.
+        """
+        if self.action != 'list':
+            return queryset
+        try:
+            lookups = opportunity_filters(self.request.query_params)
+            self.ordering = opportunity_ordering(self.request.query_params, type(self).ordering)
+        except ValueError as e:
+            raise ValidationError({'detail': str(e)})
+        return queryset.filter(**lookups)
     
     def perform_create(self, serializer):
         opportunity = serializer.save(organization=self.request.user)
         
         # Notify all volunteers about the new opportunity
-        volunteers = User.objects.filter(is_volunteer=True)
-        for volunteer in volunteers:
-            create_notification(
-                user=volunteer,
-                notification_type='opportunity',
-                message=f"New opportunity available: {opportunity.title}",
-                related_object_id=opportunity.id
-            )
+        create_broadcast(
+            notification_type='opportunity',
+            message=f"New opportunity available: {opportunity.title}",
+            related_object_id=opportunity.id
+        )
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -55,106 +97,129 @@ class OpportunityViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
             
-        matches = match_volunteers_to_opportunities(opportunity)
+        limit = _int_param(request, 'limit', MATCHES_DEFAULT_LIMIT, MATCHES_MAX_LIMIT)
+        offset = _int_param(request, 'offset', 0)
+        min_score = _float_param(request, 'min_score')
+        matches = match_volunteers_to_opportunities(opportunity, limit=limit, offset=offset, min_score=min_score)
 
         # Notify matched volunteers if this is the first time they're matched
-        for match in matches:
-            volunteer = match['volunteer']
-            create_notification(
-                user=volunteer,
+        new_matches = record_matches(opportunity, [match['volunteer'].id for match in matches])
+        if new_matches:
+            enqueue(
+                'notifications.utils.bulk_create_notifications',
+                user_ids=new_matches,
                 notification_type='opportunity',
                 message=f"You've been matched to {opportunity.title} based on your skills",
                 related_object_id=opportunity.id
             )
-        return Response(matches)
+        return Response(MatchResultSerializer(matches, many=True).data)
     
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(QueryPlanMixin, CachedResponseMixin, viewsets.ModelViewSet):
     serializer_class = EventSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering = 'start_time'
+    cache_resource = 'events'
 
     def get_queryset(self):
         return Event.objects.all()
 
     def perform_create(self, serializer):
-        serializer.save(created_by=self.request.user)
+        event = serializer.save(created_by=self.request.user)
         # Notify volunteers about new event
-        volunteers = User.objects.filter(is_volunteer=True)
-        for volunteer in volunteers:
-            create_notification(
-                user=volunteer,
-                notification_type='event',
-                message=f"New event scheduled: {event.title}",
-                related_object_id=event.id
-            )
+        create_broadcast(
+            notification_type='event',
+            message=f"New event scheduled: {event.title}",
+            related_object_id=event.id
+        )
+
+    def perform_update(self, serializer):
+        previous_capacity = serializer.instance.max_attendees
+        event = serializer.save()
+        # Raising capacity opens slots for the waitlist
+        if event.max_attendees > previous_capacity and promote_waitlist(event.id):
+            event.refresh_from_db(fields=['attending_count'])
 
     @action(detail=True, methods=['POST'])
     def attend(self, request, pk=None):
         event = self.get_object()
-        RSVP.objects.create(user=request.user, event=event, status='ATTENDING')
+        try:
+            rsvp = admit(request.user, event)
+        except EventFull:
+            return Response({'error': 'Event is full'}, status=status.HTTP_400_BAD_REQUEST)
+        except AlreadyRegistered:
+            return Response({'error': 'You already have an RSVP for this event'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if rsvp.status == 'WAITLISTED':
+            return Response({'status': 'waitlisted for event'})
         return Response({'status': 'registered for event'})
     
     @action(detail=True, methods=['POST'])
     def rsvp(self, request, pk=None):
         event = self.get_object()
     
-        # Check current attendance count
-        attendee_count = event.rsvps.filter(status='ATTENDING').count()
-        
-        # Determine status based on capacity
-        if attendee_count < event.max_attendees:
-            status_value = 'ATTENDING'
-        elif event.waitlist_enabled:
-            status_value = 'WAITLISTED'
-        else:
+        # Admit or waitlist based on capacity, atomically
+        try:
+            rsvp = admit(request.user, event)
+        except EventFull:
             return Response({'error': 'Event is full and waitlist is disabled'}, 
                         status=status.HTTP_400_BAD_REQUEST)
-        
-        # Create RSVP with appropriate status
-        rsvp = RSVP.objects.create(
-            user=request.user, 
-            event=event, 
-            status=status_value
-        )
+        except AlreadyRegistered:
+            return Response({'error': 'You already have an RSVP for this event'},
+                        status=status.HTTP_400_BAD_REQUEST)
+        status_value = rsvp.status
 
-        # Create notification for the user
-        create_notification(
-            user=request.user,
-            notification_type='rsvp',
-            message=f"Your RSVP for {event.title} is {status_value}",
-            related_object_id=event.id
-        )
-        
-        # Notify event creator
-        create_notification(
-            user=event.created_by,
-            notification_type='rsvp',
-            message=f"{request.user.username} has RSVP'd to your event: {event.title}",
-            related_object_id=event.id
+        # Notify the user and the event creator; not deduplicated, since
+        # RSVPing again after a cancellation is a new event worth a notification
+        enqueue(
+            'notifications.utils.bulk_create_individual_notifications',
+            notifications=[
+                {
+                    'user_id': request.user.id,
+                    'notification_type': 'rsvp',
+                    'message': f"Your RSVP for {event.title} is {status_value}",
+                    'related_object_id': event.id,
+                },
+                {
+                    'user_id': event.created_by_id,
+                    'notification_type': 'rsvp',
+                    'message': f"{request.user.username} has RSVP'd to your event: {event.title}",
+                    'related_object_id': event.id,
+                },
+            ],
         )
         
         serializer = RSVPSerializer(rsvp)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-class RSVPViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['POST'])
+    def cancel_rsvp(self, request, pk=None):
+        event = self.get_object()
+        rsvp = RSVP.objects.filter(user=request.user, event=event).exclude(status='CANCELLED').first()
+        if rsvp is None:
+            return Response({'error': 'You do not have an active RSVP for this event'},
+                        status=status.HTTP_404_NOT_FOUND)
+        cancel_rsvp(rsvp)
+        return Response(RSVPSerializer(rsvp).data)
+
+class RSVPViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     serializer_class = RSVPSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering = '-created_at'
+    # No updates: moving an RSVP to another event would bypass admit(), and
+    # status changes go through the event's rsvp/cancel_rsvp actions
+    http_method_names = ['get', 'post', 'delete', 'head', 'options']
 
     def get_queryset(self):
         return RSVP.objects.filter(user=self.request.user)
 
     def perform_create(self, serializer):
         event = serializer.validated_data['event']
-        
-        if RSVP.objects.filter(user=self.request.user, event=event).exists():
+        try:
+            serializer.instance = admit(self.request.user, event)
+        except AlreadyRegistered:
             raise ValidationError("You already have an RSVP for this event")
-            
-        if event.rsvps.filter(status='ATTENDING').count() >= event.max_attendees:
-            if event.waitlist_enabled:
-                serializer.save(user=self.request.user, status='WAITLISTED')
-            else:
-                raise ValidationError("Event is full")
-        else:
-            serializer.save(user=self.request.user)
+        except EventFull:
+            raise ValidationError("Event is full")
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -163,7 +228,7 @@ def organization_opportunities(request):
     if not request.user.is_organization:
         return Response({"detail": "Only organizations can access this endpoint"}, status=403)
     
-    opportunities = Opportunity.objects.filter(organization=request.user)
+    opportunities = plan_queryset(Opportunity.objects.filter(organization=request.user), OpportunitySerializer)
     serializer = OpportunitySerializer(opportunities, many=True)
     return Response(serializer.data)
 
@@ -174,20 +239,40 @@ def recommended_opportunities(request):
     if not request.user.is_volunteer:
         return Response({"detail": "Only volunteers can access this endpoint"}, status=403)
     
-    # Get user's skills and interests
-    user_skills = request.user.skills
-    user_interests = request.user.interests
-    
-    # Find opportunities matching skills and interests
-    # This is a simple implementation - you can make it more sophisticated
-    if user_skills or user_interests:
-        opportunities = Opportunity.objects.filter(
-            Q(required_skills__overlap=user_skills) | 
-            Q(category__in=user_interests)
-        ).distinct()[:6]  # Limit to 6 recommendations
-    else:
-        # If no skills/interests, return recent opportunities
-        opportunities = Opportunity.objects.filter(status='OPEN').order_by('-created_at')[:6]
+    recommendations = (
+        Recommendation.objects.filter(volunteer=request.user, opportunity__status='OPEN')
+        .select_related('opportunity__organization')
+        .order_by('-score')[:RECOMMENDATIONS_LIMIT]
+    )
+    opportunities = [recommendation.opportunity for recommendation in recommendations]
+    if not opportunities:
+        # Nothing matches the volunteer's skills or interests: show recent opportunities
+        opportunities = plan_queryset(
+            Opportunity.objects.filter(status='OPEN').order_by('-created_at'), OpportunitySerializer
+        )[:RECOMMENDATIONS_LIMIT]
     
     serializer = OpportunitySerializer(opportunities, many=True)
-    return Response(serializer.data)
\ No newline at end of file
+    return Response(serializer.data)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_listings(request):
+    """
+    Full-text search over opportunity and event titles and descriptions.
+
+    ``?q=`` matches every term as a prefix; ``?type=opportunity|event``
+    narrows the search. Results are ranked, with matches wrapped in
+    ``<mark>`` in ``title_highlight`` and ``snippet`` (the rest is escaped).
+    """
+    text = request.query_params.get('q', '').strip()
+    if not text:
+        raise ValidationError({'q': "Enter search terms"})
+    types = tuple(SEARCH_TYPES)
+    if request.query_params.get('type'):
+        if request.query_params['type'] not in SEARCH_TYPES:
+            raise ValidationError({'type': f"Must be one of: {', '.join(SEARCH_TYPES)}"})
+        types = (request.query_params['type'],)
+    limit = max(_int_param(request, 'limit', SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT), 1)
+
+    results = search(text, types, limit)
+    return Response({'results': SearchResultSerializer(results, many=True).data})
@@ -18,7 +18,7 @@ const SimplifiedDashboard = () => {
       try {
         // Fetch general opportunities (works for both user types)
         const opportunitiesResponse = await apiClient.get('opportunities/');
-        setOpportunities(opportunitiesResponse.data);
+        setOpportunities(opportunitiesResponse.data.results);
 
         // Fetch applications if user is a volunteer
         if (currentUser?.is_volunteer) {
@@ -26,7 +26,7 @@ const SimplifiedDashboard = () => {
           setApplications(applicationsResponse.data);
 
           const hoursResponse = await apiClient.get('volunteer-hours/');
-          setVolunteerHours(hoursResponse.data);
+          setVolunteerHours(hoursResponse.data.results);
         }
 
         setLoading(false);
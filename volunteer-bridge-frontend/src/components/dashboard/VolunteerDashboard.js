@@ -53,7 +53,7 @@ const VolunteerDashboard = () => {
         console.log('[2/3] Fetching volunteer hours...');
         const hoursResponse = await apiClient.get('volunteer-hours/');
         console.log('Volunteer hours response:', hoursResponse);
-        setVolunteerHours(hoursResponse.data);
+        setVolunteerHours(hoursResponse.data.results);
     
         // Recommended opportunities request
         console.log('[3/3] Fetching recommended opportunities...');
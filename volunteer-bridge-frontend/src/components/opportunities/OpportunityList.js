@@ -26,8 +26,8 @@ const OpportunityList = () => {
     const fetchOpportunities = async () => {
       try {
         const response = await apiClient.get('opportunities/');
-        setOpportunities(response.data);
-        setFilteredOpportunities(response.data);
+        setOpportunities(response.data.results);
+        setFilteredOpportunities(response.data.results);
         setLoading(false);
       } catch (err) {
         console.error('Error fetching opportunities:', err);
@@ -19,7 +19,7 @@ describe('OpportunityList Component', () => {
   test('shows loading state initially and then displays data', async () => {
     // Mock API response
     apiClient.get.mockResolvedValue({ 
-      data: [{ id: 1, title: 'Test Opportunity', description: 'Test Description' }] 
+      data: { next: null, results: [{ id: 1, title: 'Test Opportunity', description: 'Test Description' }] }
     });
     
     renderWithRouter(<OpportunityList />);
@@ -0,0 +1,123 @@
+import heapq
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from itertools import islice
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only cursor pagination over ``(ordering field, pk)``.
+
+    Each page is fetched with ``WHERE (field, pk) > cursor ... LIMIT n``, so
+    deep pages cost the same as the first one and ties on the ordering
+    field never skip or repeat rows. The ordering comes from the view's
+    ``ordering`` attribute (e.g. ``'-created_at'``).
+
+    ``paginate_querysets`` merges several querysets that share the ordering
+    field into one stream; the position of each queryset in the list breaks
+    ties between rows from different sources.
+    """
+    page_size = api_settings.PAGE_SIZE or 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = '-created_at'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(requested, 1), self.max_page_size)
+
+    def get_ordering(self, view):
+        ordering = getattr(view, 'ordering', None) or self.ordering
+        return ordering.lstrip('-'), ordering.startswith('-')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_querysets([queryset], request, view)
+
+    def paginate_querysets(self, querysets, request, view=None):
+        self.request = request
+        self.field, self.descending = self.get_ordering(view)
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request, querysets)
+
+        direction = '-' if self.descending else ''
+        streams = []
+        for rank, queryset in enumerate(querysets):
+            queryset = queryset.order_by(direction + self.field, direction + 'pk')
+            if position is not None:
+                queryset = queryset.filter(self.after_position(position, rank))
+            streams.append(self.keyed_rows(queryset[:page_size + 1], rank))
+
+        rows = list(islice(
+            heapq.merge(*streams, key=lambda row: row[0], reverse=self.descending),
+            page_size + 1,
+        ))
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_position = rows[-1][0] if self.has_next else None
+        return [obj for _, obj in rows]
+
+    def keyed_rows(self, rows, rank):
+        for obj in rows:
+            yield (getattr(obj, self.field), rank, obj.pk), obj
+
+    def after_position(self, position, rank):
+        """Rows of stream ``rank`` that sort strictly after ``position``"""
+        value, cursor_rank, pk = position
+        lookup = 'lt' if self.descending else 'gt'
+        past_value = Q(**{f'{self.field}__{lookup}': value})
+        if rank == cursor_rank:
+            return past_value | Q(**{self.field: value, f'pk__{lookup}': pk})
+        ties_follow = rank < cursor_rank if self.descending else rank > cursor_rank
+        return past_value | Q(**{self.field: value}) if ties_follow else past_value
+
+    def decode_cursor(self, request, querysets):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw_value, rank, pk = json.loads(urlsafe_b64decode(encoded.encode()))
+            if not 0 <= rank < len(querysets):
+                raise IndexError(rank)
+            model_field = querysets[rank].model._meta.get_field(self.field)
+            return model_field.to_python(raw_value), rank, int(pk)
+        except (TypeError, ValueError, IndexError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        value, rank, pk = position
+        raw_value = value.isoformat() if hasattr(value, 'isoformat') else value
+        return urlsafe_b64encode(json.dumps([raw_value, rank, pk]).encode()).decode()
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
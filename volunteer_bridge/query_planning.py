@@ -0,0 +1,27 @@
+def plan_queryset(queryset, serializer_class):
+    """
+    Apply the relations a serializer declares it reads to ``queryset``.
+
+    Serializers list them on their ``Meta`` as ``select_related`` (forward
+    foreign keys, joined in the same query) and ``prefetch_related``
+    (reverse and many-to-many relations, one extra query each), e.g.::
+
+        class Meta:
+            model = Application
+            select_related = ('volunteer', 'opportunity__organization')
+    """
+    meta = getattr(serializer_class, 'Meta', None)
+    select_related = getattr(meta, 'select_related', ())
+    prefetch_related = getattr(meta, 'prefetch_related', ())
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return queryset
+
+
+class QueryPlanMixin:
+    """Viewset mixin that plans ``get_queryset()`` for the serializer in use"""
+
+    def get_queryset(self):
+        return plan_queryset(super().get_queryset(), self.get_serializer_class())
@@ -51,6 +51,7 @@ INSTALLED_APPS = [
     'opportunities',
     'volunteer_hours',
     'notifications',
+    'jobs',
 ]
 
 MIDDLEWARE = [
@@ -118,6 +119,25 @@ DATABASES = {
 }
 
 
+# Caches
+# 'listings' holds rendered opportunity/event API responses. LocMemCache is
+# per process; to share it between workers switch it to
+# django.core.cache.backends.filebased.FileBasedCache (LOCATION: a directory)
+# or django.core.cache.backends.db.DatabaseCache (LOCATION: a table created
+# with `manage.py createcachetable`).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'listings': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'listings',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -147,7 +167,34 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': (
         'rest_framework.renderers.JSONRenderer',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'volunteer_bridge.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
+}
+
+# Volunteer matching
+# 'postings' reads the inverted skill index, 'jsonb' scores User.skills in SQL,
+# 'weighted' combines the factors below in an in-process volunteer matrix
+MATCHING_BACKEND = 'postings'
+# Weights of the 'weighted' backend; each factor scores between 0 and 1
+MATCHING_WEIGHTS = {
+    'skills': 0.6,      # IDF-weighted share of the required skills
+    'interest': 0.2,    # opportunity category is one of the volunteer's interests
+    'virtual': 0.1,     # volunteer's virtual/in-person preference fits
+    'commitment': 0.1,  # weekly hours available cover commitment_hours
 }
+# Seconds a process reuses its volunteer matrix before reloading it
+MATCHING_MATRIX_TTL = 300
+
+# Background jobs
+# 'thread' runs jobs on an in-process pool, 'database' queues them in the
+# jobs.Job table for `manage.py run_jobs`, 'immediate' runs them inline
+JOBS_BACKEND = 'thread'
+JOBS_THREAD_WORKERS = 4
+JOBS_MAX_ATTEMPTS = 3
+
+# Read notifications older than this are moved to the archive by
+# `manage.py compact_notifications`
+NOTIFICATION_RETENTION_DAYS = 90
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
@@ -0,0 +1,28 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def count_queries(func, *args, **kwargs):
+    """Run ``func`` and return ``(result, number of queries it issued)``"""
+    with CaptureQueriesContext(connection) as context:
+        result = func(*args, **kwargs)
+    return result, len(context.captured_queries)
+
+
+def assert_queries_do_not_grow(client, url, add_rows, max_queries=None):
+    """
+    Assert that GET ``url`` issues the same number of queries before and
+    after ``add_rows()`` creates more rows for it to list (no N+1), and
+    at most ``max_queries`` if given. The endpoint should already list at
+    least one row, since prefetches are skipped for empty results.
+    Returns the query count.
+    """
+    response, before = count_queries(client.get, url)
+    assert response.status_code == 200, response.content
+    add_rows()
+    response, after = count_queries(client.get, url)
+    assert response.status_code == 200, response.content
+    assert after == before, f"{url} issued {before} queries, then {after} after adding rows"
+    if max_queries is not None:
+        assert after <= max_queries, f"{url} issued {after} queries (max {max_queries})"
+    return after
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class VolunteerHoursConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'volunteer_hours'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,85 @@
+import csv
+import json
+from django.utils.dateparse import parse_date
+
+# (column name, queryset lookup) of every exported field, in column order
+EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('volunteer_id', 'volunteer_id'),
+    ('volunteer', 'volunteer__username'),
+    ('opportunity_id', 'opportunity_id'),
+    ('opportunity', 'opportunity__title'),
+    ('start_time', 'start_time'),
+    ('end_time', 'end_time'),
+    ('hours_volunteered', 'hours_volunteered'),
+    ('verified', 'verified'),
+    ('verified_by_id', 'verified_by_id'),
+    ('notes', 'notes'),
+)
+EXPORT_CHUNK_SIZE = 2000
+
+
+def export_filters(params):
+    """
+    Queryset lookups for the export filters in ``params``: ``from``/``to``
+    (inclusive dates of ``start_time``), ``opportunity`` and ``verified``.
+    Raises ``ValueError`` for malformed values.
+    """
+    lookups = {}
+    for name, lookup in (('from', 'start_time__date__gte'), ('to', 'start_time__date__lte')):
+        if params.get(name):
+            value = parse_date(params[name])
+            if value is None:
+                raise ValueError(f"{name}: expected a YYYY-MM-DD date")
+            lookups[lookup] = value
+    if params.get('opportunity'):
+        try:
+            lookups['opportunity_id'] = int(params['opportunity'])
+        except ValueError:
+            raise ValueError("opportunity: expected an id")
+    if params.get('verified') not in (None, ''):
+        verified = str(params['verified']).lower()
+        if verified not in ('true', 'false'):
+            raise ValueError("verified: expected true or false")
+        lookups['verified'] = verified == 'true'
+    return lookups
+
+
+def _export_rows(queryset, chunk_size):
+    # Plain tuples straight from a server-side cursor; no model instances
+    rows = queryset.order_by('start_time', 'id').values_list(*(lookup for _, lookup in EXPORT_COLUMNS))
+    return rows.iterator(chunk_size=chunk_size)
+
+
+def _plain(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    return str(value)
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the line back to the caller"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for row in _export_rows(queryset, chunk_size):
+        yield writer.writerow([_plain(value) for value in row])
+
+
+def ndjson_lines(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    names = [name for name, _ in EXPORT_COLUMNS]
+    for row in _export_rows(queryset, chunk_size):
+        yield json.dumps(dict(zip(names, map(_plain, row)))) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (csv_lines, 'text/csv'),
+    'ndjson': (ndjson_lines, 'application/x-ndjson'),
+}
@@ -0,0 +1,239 @@
+import csv
+import json
+from collections import defaultdict
+from decimal import Decimal
+from itertools import islice
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from accounts.models import User
+from opportunities.models import Opportunity
+from .models import VolunteerHour
+from .overlaps import lock_volunteers, overlapping_pairs
+from .rollups import record_shifts
+
+IMPORT_BATCH_SIZE = 1000
+# Rows with errors beyond this many are counted but not listed in the report
+MAX_REPORTED_ERRORS = 1000
+SECONDS_PER_HOUR = Decimal(3600)
+CENT = Decimal('0.01')
+# hours_volunteered is a DecimalField(max_digits=5, decimal_places=2)
+MAX_SHIFT_HOURS = Decimal('999.99')
+
+
+def csv_records(lines):
+    return csv.DictReader(lines)
+
+
+def ndjson_records(lines):
+    for line in lines:
+        if line.strip():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield record if isinstance(record, dict) else {'__invalid__': line}
+
+
+IMPORT_FORMATS = {
+    'csv': csv_records,
+    'ndjson': ndjson_records,
+}
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        # Why reading stopped early, if it did; the batches before were saved
+        self.error = None
+
+    def reject(self, row, messages):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row, 'errors': messages})
+
+    def as_dict(self):
+        report = {'created': self.created, 'failed': self.failed, 'errors': self.errors}
+        if self.error:
+            report['error'] = self.error
+        return report
+
+
+def _parse_time(value):
+    try:
+        moment = parse_datetime(str(value or '').strip())
+    except ValueError:
+        # Well formed but impossible, e.g. February 30th
+        return None
+    if moment is not None and timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def _shift_hours(fields):
+    # As VolunteerHour.save would compute them
+    return (Decimal((fields['end_time'] - fields['start_time']).total_seconds()) / SECONDS_PER_HOUR).quantize(CENT)
+
+
+def _parse_record(record):
+    """``(fields, errors)`` of one input record, without touching the database"""
+    if '__invalid__' in record:
+        return None, ["Not a JSON object"]
+    errors = []
+    fields = {'notes': str(record.get('notes') or '')}
+
+    # Exported files carry both; the id wins
+    if record.get('volunteer_id') not in (None, ''):
+        try:
+            fields['volunteer_key'] = ('id', int(record['volunteer_id']))
+        except (TypeError, ValueError):
+            errors.append("volunteer_id must be an id")
+    elif record.get('volunteer'):
+        fields['volunteer_key'] = ('username', str(record['volunteer']))
+    else:
+        errors.append("volunteer_id or volunteer is required")
+
+    try:
+        fields['opportunity_id'] = int(record.get('opportunity_id'))
+    except (TypeError, ValueError):
+        errors.append("opportunity_id must be an id")
+
+    for name in ('start_time', 'end_time'):
+        fields[name] = _parse_time(record.get(name))
+        if fields[name] is None:
+            errors.append(f"{name} must be an ISO 8601 date and time")
+    if fields['start_time'] and fields['end_time']:
+        if fields['start_time'] >= fields['end_time']:
+            errors.append("End time must be after start time")
+        elif _shift_hours(fields) > MAX_SHIFT_HOURS:
+            errors.append(f"Shifts must be at most {MAX_SHIFT_HOURS} hours")
+    return fields, errors
+
+
+def _existing_intervals(rows):
+    """Stored shifts of the batch's volunteers that fall in the batch's time span"""
+    volunteer_ids = {fields['volunteer_id'] for _, fields in rows}
+    span = VolunteerHour.objects.none()
+    if rows:
+        earliest = min(fields['start_time'] for _, fields in rows)
+        latest = max(fields['end_time'] for _, fields in rows)
+        span = VolunteerHour.objects.filter(
+            volunteer_id__in=volunteer_ids, start_time__lt=latest, end_time__gt=earliest,
+        )
+    return span.values_list('id', 'volunteer_id', 'start_time', 'end_time')
+
+
+def _without_overlaps(rows, report):
+    """
+    The ``(row, fields)`` pairs that overlap neither the volunteer's stored
+    shifts (which include the earlier batches) nor an earlier row of the
+    batch; the others are rejected into ``report``.
+    """
+    by_volunteer = defaultdict(list)
+    for hour_id, volunteer_id, start, end in _existing_intervals(rows):
+        by_volunteer[volunteer_id].append((('hours', hour_id), start, end))
+    for row, fields in rows:
+        by_volunteer[fields['volunteer_id']].append((('row', row), fields['start_time'], fields['end_time']))
+    overlaps = {}
+    for intervals in by_volunteer.values():
+        for pair in overlapping_pairs(intervals):
+            # Stored hours sort first, then rows in file order; the last one is rejected
+            (kind, other), (later_kind, row) = sorted(pair, key=lambda key: (key[0] == 'row', key[1]))
+            if later_kind == 'row' and (row not in overlaps or kind == 'hours'):
+                overlaps[row] = f"Overlaps {kind} {other}"
+
+    accepted = []
+    for row, fields in rows:
+        if row in overlaps:
+            report.reject(row, [overlaps[row]])
+        else:
+            accepted.append(fields)
+    return accepted
+
+
+def _import_batch(records, organization, report):
+    parsed = []
+    for row, record in records:
+        fields, errors = _parse_record(record)
+        if errors:
+            report.reject(row, errors)
+        else:
+            parsed.append((row, fields))
+
+    # One query each for every volunteer and opportunity the batch refers to
+    keys = {fields['volunteer_key'] for _, fields in parsed}
+    volunteers = {}
+    matching = Q(id__in=[value for kind, value in keys if kind == 'id']) | Q(
+        username__in=[value for kind, value in keys if kind == 'username']
+    )
+    for volunteer_id, username in User.objects.filter(matching, is_volunteer=True).values_list('id', 'username'):
+        volunteers[('id', volunteer_id)] = volunteer_id
+        volunteers[('username', username)] = volunteer_id
+    owned = set(
+        Opportunity.objects.filter(
+            organization=organization, id__in={fields['opportunity_id'] for _, fields in parsed}
+        ).values_list('id', flat=True)
+    )
+
+    valid = []
+    for row, fields in parsed:
+        errors = []
+        fields['volunteer_id'] = volunteers.get(fields['volunteer_key'])
+        if fields['volunteer_id'] is None:
+            errors.append("Unknown volunteer")
+        if fields['opportunity_id'] not in owned:
+            errors.append("Unknown opportunity, or not one of yours")
+        if errors:
+            report.reject(row, errors)
+        else:
+            valid.append((row, fields))
+
+    # Locked from the overlap check through the write, so a concurrent import
+    # or API create cannot slip an overlapping shift in between
+    with transaction.atomic():
+        lock_volunteers({fields['volunteer_id'] for _, fields in valid})
+        accepted = _without_overlaps(valid, report)
+        hours = [_shift_hours(fields) for fields in accepted]
+        VolunteerHour.objects.bulk_create(
+            [
+                VolunteerHour(
+                    volunteer_id=fields['volunteer_id'], opportunity_id=fields['opportunity_id'],
+                    start_time=fields['start_time'], end_time=fields['end_time'],
+                    hours_volunteered=hours_volunteered, notes=fields['notes'],
+                )
+                for fields, hours_volunteered in zip(accepted, hours)
+            ],
+            batch_size=IMPORT_BATCH_SIZE,
+        )
+        # bulk_create skips the signals that maintain the rollups
+        record_shifts(
+            (fields['volunteer_id'], fields['opportunity_id'], organization.id, fields['start_time'], hours_volunteered, False)
+            for fields, hours_volunteered in zip(accepted, hours)
+        )
+    report.created += len(accepted)
+
+
+def import_hours(organization, lines, input_format='csv', batch_size=IMPORT_BATCH_SIZE):
+    """
+    Import shifts for ``organization``'s opportunities from an iterable of
+    CSV or NDJSON text lines.
+
+    Records are read incrementally and handled ``batch_size`` at a time:
+    validated (times, volunteer, opportunity ownership, overlaps with stored
+    shifts and earlier rows), then written with ``bulk_create`` in the
+    batch's own transaction. Invalid rows are skipped and reported by their
+    1-based record number. Text that is not valid UTF-8 stops the import;
+    the report then carries an ``error`` and counts what was already saved.
+    Returns the report as a dict.
+    """
+    report = ImportReport()
+    records = enumerate(IMPORT_FORMATS[input_format](lines), start=1)
+    try:
+        while batch := list(islice(records, batch_size)):
+            _import_batch(batch, organization, report)
+    except UnicodeDecodeError:
+        report.error = f"Not valid UTF-8 text; stopped after {report.created + report.failed} rows"
+    return report.as_dict()
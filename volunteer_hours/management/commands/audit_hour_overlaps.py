@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import User
+from volunteer_hours.models import VolunteerHour
+from volunteer_hours.overlaps import AUDIT_CHUNK_SIZE, hour_conflicts
+
+
+class Command(BaseCommand):
+    help = "Report volunteer hours that overlap other hours of the same volunteer"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--volunteer', help="Only this volunteer's hours (username)")
+        parser.add_argument('--chunk-size', type=int, default=AUDIT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        hours = VolunteerHour.objects.all()
+        if options['volunteer']:
+            try:
+                volunteer = User.objects.get(username=options['volunteer'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {options['volunteer']}")
+            hours = hours.filter(volunteer=volunteer)
+
+        conflicts = 0
+        for volunteer_id, earlier, later in hour_conflicts(hours, options['chunk_size']):
+            conflicts += 1
+            self.stdout.write(f"volunteer {volunteer_id}: hours {earlier} overlaps hours {later}")
+        self.stdout.write(f"Found {conflicts} overlapping pairs")
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import User
+from volunteer_hours.export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_filters
+from volunteer_hours.models import VolunteerHour
+
+
+class Command(BaseCommand):
+    help = "Stream volunteer hours as CSV or NDJSON to stdout or a file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--file', help="Write to this path instead of stdout")
+        parser.add_argument('--organization', help="Only hours of this organization's opportunities (username)")
+        parser.add_argument('--from', dest='from', help="First start date, YYYY-MM-DD")
+        parser.add_argument('--to', help="Last start date, YYYY-MM-DD")
+        parser.add_argument('--opportunity', help="Opportunity id")
+        parser.add_argument('--verified', choices=['true', 'false'])
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            lookups = export_filters(options)
+        except ValueError as e:
+            raise CommandError(str(e))
+        hours = VolunteerHour.objects.filter(**lookups)
+        if options['organization']:
+            try:
+                organization = User.objects.get(username=options['organization'], is_organization=True)
+            except User.DoesNotExist:
+                raise CommandError(f"No organization named {options['organization']}")
+            hours = hours.filter(opportunity__organization=organization)
+
+        lines, _ = EXPORT_FORMATS[options['output']]
+        if options['file']:
+            with open(options['file'], 'w', newline='', encoding='utf-8') as out:
+                out.writelines(lines(hours, options['chunk_size']))
+        else:
+            for line in lines(hours, options['chunk_size']):
+                self.stdout.write(line, ending='')
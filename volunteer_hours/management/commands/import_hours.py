@@ -0,0 +1,30 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import User
+from volunteer_hours.importer import IMPORT_BATCH_SIZE, IMPORT_FORMATS, import_hours
+
+
+class Command(BaseCommand):
+    help = "Import volunteer hours for an organization from a CSV or NDJSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File in the columns of export_hours")
+        parser.add_argument('--organization', required=True, help="Organization owning the opportunities (username)")
+        parser.add_argument('--input', choices=sorted(IMPORT_FORMATS), default='csv')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument('--report', help="Write the per-row error report to this path as JSON")
+
+    def handle(self, *args, **options):
+        try:
+            organization = User.objects.get(username=options['organization'], is_organization=True)
+        except User.DoesNotExist:
+            raise CommandError(f"No organization named {options['organization']}")
+
+        with open(options['path'], newline='', encoding='utf-8-sig') as lines:
+            report = import_hours(organization, lines, options['input'], options['batch_size'])
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as out:
+                json.dump(report['errors'], out, indent=2)
+        self.stdout.write(f"Imported {report['created']} hours, rejected {report['failed']} rows")
+        if 'error' in report:
+            raise CommandError(report['error'])
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from volunteer_hours.rollups import rebuild_hour_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the volunteer hour rollups from the hours table"
+
+    def handle(self, *args, **options):
+        rows = rebuild_hour_rollups()
+        self.stdout.write(f"Rebuilt {rows} rollup rows")
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('volunteer_hours', '0002_alter_volunteerhour_hours_volunteered'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HourRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('volunteer', 'Volunteer'), ('opportunity', 'Opportunity'), ('organization', 'Organization')], max_length=12)),
+                ('subject_id', models.BigIntegerField()),
+                ('period', models.CharField(choices=[('all', 'All time'), ('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('total_hours', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('verified_hours', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('shift_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['scope', 'period', 'period_start', '-total_hours'], name='rollup_total_rank_idx'), models.Index(fields=['scope', 'period', 'period_start', '-verified_hours'], name='rollup_verified_rank_idx')],
+                'unique_together': {('scope', 'subject_id', 'period', 'period_start')},
+            },
+        ),
+    ]
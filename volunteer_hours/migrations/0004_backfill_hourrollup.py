@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.db import migrations
+
+BACKFILL_SQL = """
+INSERT INTO {rollups} (scope, subject_id, period, period_start, total_hours, verified_hours, shift_count)
+SELECT %s, {subject}, %s, {period_start},
+       SUM(COALESCE(h.hours_volunteered, 0)),
+       SUM(CASE WHEN h.verified THEN COALESCE(h.hours_volunteered, 0) ELSE 0 END),
+       COUNT(*)
+FROM {hours} h JOIN {opportunities} o ON o.id = h.opportunity_id
+GROUP BY 2, 4
+"""
+SUBJECTS = {
+    'volunteer': 'h.volunteer_id',
+    'opportunity': 'h.opportunity_id',
+    'organization': 'o.organization_id',
+}
+
+
+def backfill_hour_rollups(apps, schema_editor):
+    quote = schema_editor.connection.ops.quote_name
+    tables = {
+        'rollups': quote(apps.get_model('volunteer_hours', 'HourRollup')._meta.db_table),
+        'hours': quote(apps.get_model('volunteer_hours', 'VolunteerHour')._meta.db_table),
+        'opportunities': quote(apps.get_model('opportunities', 'Opportunity')._meta.db_table),
+    }
+    period_starts = {
+        'all': ("DATE '1970-01-01'", []),
+        'week': ("date_trunc('week', h.start_time AT TIME ZONE %s)::date", [settings.TIME_ZONE]),
+        'month': ("date_trunc('month', h.start_time AT TIME ZONE %s)::date", [settings.TIME_ZONE]),
+    }
+    with schema_editor.connection.cursor() as cursor:
+        for scope, subject in SUBJECTS.items():
+            for period, (period_start, params) in period_starts.items():
+                sql = BACKFILL_SQL.format(subject=subject, period_start=period_start, **tables)
+                cursor.execute(sql, [scope, period, *params])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('volunteer_hours', '0003_hourrollup'),
+        ('opportunities', '0017_opportunitymatch'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_hour_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('volunteer_hours', '0004_backfill_hourrollup'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='volunteerhour',
+            index=models.Index(fields=['volunteer', 'start_time', 'end_time'], name='hour_volunteer_interval_idx'),
+        ),
+    ]
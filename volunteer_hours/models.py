@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from accounts.models import User
 from opportunities.models import Opportunity
@@ -18,6 +18,12 @@ class VolunteerHour(models.Model):
     )
     notes = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            # Overlap checks: a volunteer's shifts starting before a given end
+            models.Index(fields=['volunteer', 'start_time', 'end_time'], name='hour_volunteer_interval_idx'),
+        ]
+
     def clean(self):
         if self.start_time >= self.end_time:
             raise ValidationError("End time must be after start time")
@@ -26,4 +32,47 @@ class VolunteerHour(models.Model):
         if not self.hours_volunteered:
             time_diff = self.end_time - self.start_time
             self.hours_volunteered = time_diff.total_seconds() / 3600
-        super().save(*args, **kwargs)
\ No newline at end of file
+        # The rollup signals lock the stored row and adjust the totals in
+        # the same transaction as the write
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
+class HourRollup(models.Model):
+    """
+    Running totals of ``VolunteerHour`` for one subject over one period.
+
+    ``scope`` says what ``subject_id`` is (a volunteer, an opportunity or an
+    organization); ``period_start`` is the Monday of the week, the first of
+    the month, or ``ALL_TIME`` for the lifetime total. Maintained by
+    ``volunteer_hours.rollups``.
+    """
+    SCOPE_CHOICES = [
+        ('volunteer', 'Volunteer'),
+        ('opportunity', 'Opportunity'),
+        ('organization', 'Organization'),
+    ]
+    PERIOD_CHOICES = [
+        ('all', 'All time'),
+        ('week', 'Week'),
+        ('month', 'Month'),
+    ]
+
+    scope = models.CharField(max_length=12, choices=SCOPE_CHOICES)
+    subject_id = models.BigIntegerField()
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    total_hours = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    verified_hours = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    shift_count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('scope', 'subject_id', 'period', 'period_start')
+        indexes = [
+            # Leaderboards: best subjects of one period
+            models.Index(fields=['scope', 'period', 'period_start', '-total_hours'], name='rollup_total_rank_idx'),
+            models.Index(fields=['scope', 'period', 'period_start', '-verified_hours'], name='rollup_verified_rank_idx'),
+        ]
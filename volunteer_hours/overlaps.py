@@ -0,0 +1,69 @@
+import heapq
+from itertools import groupby
+from django.db import transaction
+from accounts.models import User
+from .models import VolunteerHour
+
+AUDIT_CHUNK_SIZE = 5000
+
+
+def overlapping_pairs(intervals):
+    """
+    Pairs of overlapping intervals among ``(key, start, end)`` tuples.
+
+    A sorted sweep keeps the intervals still open at each start in a heap
+    ordered by end, so the cost is O(n log n) plus the number of conflicts.
+    Intervals that only touch (one ends when the next starts) do not
+    overlap. Each pair is ``(earlier key, later key)`` by start time.
+    """
+    active = []
+    pairs = []
+    for order, (key, start, end) in enumerate(sorted(intervals, key=lambda interval: (interval[1], interval[2]))):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        pairs.extend((other, key) for _, _, other in active)
+        heapq.heappush(active, (end, order, key))
+    return pairs
+
+
+def lock_volunteers(volunteer_ids):
+    """
+    Lock the volunteers' rows until the transaction ends, so that checking
+    for overlaps and writing the new hours cannot interleave with another
+    writer of the same volunteer's hours. Ids are locked in order to avoid
+    deadlocks. ``FOR NO KEY UPDATE`` leaves the foreign key checks of other
+    inserts unblocked. Outside a transaction there is nothing to hold the
+    lock for, and this does nothing.
+    """
+    if not transaction.get_connection().in_atomic_block:
+        return
+    list(
+        User.objects.select_for_update(no_key=True).filter(id__in=volunteer_ids)
+        .order_by('id').values_list('id', flat=True)
+    )
+
+
+def overlapping_hours(volunteer_id, start, end, exclude_id=None):
+    """The volunteer's stored hours that overlap ``[start, end)``"""
+    hours = VolunteerHour.objects.filter(volunteer_id=volunteer_id, start_time__lt=end, end_time__gt=start)
+    if exclude_id is not None:
+        hours = hours.exclude(id=exclude_id)
+    return hours
+
+
+def hour_conflicts(queryset=None, chunk_size=AUDIT_CHUNK_SIZE):
+    """
+    Yield ``(volunteer_id, earlier_id, later_id)`` for every pair of
+    overlapping hours in ``queryset`` (default: all hours).
+
+    Hours are streamed ordered by volunteer and start time, so only one
+    volunteer's shifts are in memory at a time.
+    """
+    if queryset is None:
+        queryset = VolunteerHour.objects.all()
+    rows = queryset.order_by('volunteer_id', 'start_time', 'id').values_list(
+        'volunteer_id', 'id', 'start_time', 'end_time'
+    ).iterator(chunk_size=chunk_size)
+    for volunteer_id, shifts in groupby(rows, key=lambda row: row[0]):
+        for earlier, later in overlapping_pairs((hour_id, start, end) for _, hour_id, start, end in shifts):
+            yield volunteer_id, earlier, later
@@ -0,0 +1,129 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from opportunities.models import Opportunity
+from .models import HourRollup, VolunteerHour
+
+# What a shift contributes to the rollups, as read with ``values_list``
+SHIFT_FIELDS = (
+    'volunteer_id', 'opportunity_id', 'opportunity__organization_id', 'start_time', 'hours_volunteered', 'verified',
+)
+# ``period_start`` of the lifetime totals
+ALL_TIME = date(1970, 1, 1)
+UPSERT_CHUNK_SIZE = 1000
+CENT = Decimal('0.01')
+
+# Adds the given deltas to the rollup rows, creating missing ones
+ROLLUP_UPSERT_SQL = """
+INSERT INTO {table} (scope, subject_id, period, period_start, total_hours, verified_hours, shift_count)
+VALUES {values}
+ON CONFLICT (scope, subject_id, period, period_start) DO UPDATE SET
+    total_hours = {table}.total_hours + EXCLUDED.total_hours,
+    verified_hours = {table}.verified_hours + EXCLUDED.verified_hours,
+    shift_count = {table}.shift_count + EXCLUDED.shift_count
+"""
+
+# Totals of one scope and period straight from the hours table
+ROLLUP_REBUILD_SQL = """
+INSERT INTO {rollups} (scope, subject_id, period, period_start, total_hours, verified_hours, shift_count)
+SELECT %s, {subject}, %s, {period_start},
+       SUM(COALESCE(h.hours_volunteered, 0)),
+       SUM(CASE WHEN h.verified THEN COALESCE(h.hours_volunteered, 0) ELSE 0 END),
+       COUNT(*)
+FROM {hours} h JOIN {opportunities} o ON o.id = h.opportunity_id
+GROUP BY 2, 4
+"""
+ROLLUP_SUBJECTS = {
+    'volunteer': 'h.volunteer_id',
+    'opportunity': 'h.opportunity_id',
+    'organization': 'o.organization_id',
+}
+# period_start expression of each period; week and month take the time zone
+ROLLUP_PERIOD_STARTS = {
+    'all': "DATE '1970-01-01'",
+    'week': "date_trunc('week', h.start_time AT TIME ZONE %s)::date",
+    'month': "date_trunc('month', h.start_time AT TIME ZONE %s)::date",
+}
+
+
+def period_starts(moment):
+    """``(period, period_start)`` of every rollup period containing ``moment``"""
+    day = timezone.localtime(moment).date()
+    return (
+        ('all', ALL_TIME),
+        ('week', day - timedelta(days=day.weekday())),
+        ('month', day.replace(day=1)),
+    )
+
+
+def current_period_start(period):
+    return dict(period_starts(timezone.now()))[period]
+
+
+def shift_of(hour):
+    """The ``SHIFT_FIELDS`` values of a ``VolunteerHour`` instance"""
+    return (
+        hour.volunteer_id, hour.opportunity_id, hour.opportunity.organization_id,
+        hour.start_time, hour.hours_volunteered, hour.verified,
+    )
+
+
+def add_shift(deltas, shift, sign=1):
+    """Accumulate the contribution of ``shift`` (times ``sign``) into ``deltas``"""
+    volunteer_id, opportunity_id, organization_id, start_time, hours, verified = shift
+    hours = Decimal(str(hours or 0)).quantize(CENT) * sign
+    verified_hours = hours if verified else Decimal('0.00')
+    subjects = (('volunteer', volunteer_id), ('opportunity', opportunity_id), ('organization', organization_id))
+    for scope, subject_id in subjects:
+        for period, period_start in period_starts(start_time):
+            totals = deltas.setdefault((scope, subject_id, period, period_start), [Decimal('0.00'), Decimal('0.00'), 0])
+            totals[0] += hours
+            totals[1] += verified_hours
+            totals[2] += sign
+
+
+def apply_deltas(deltas):
+    """
+    Add ``deltas`` to the rollup table with ``INSERT ... ON CONFLICT DO UPDATE``.
+
+    Keys are written in sorted order so concurrent writers lock rows in the
+    same order; keys whose deltas cancel out are skipped.
+    """
+    rows = [(key, totals) for key, totals in sorted(deltas.items()) if any(totals)]
+    table = connection.ops.quote_name(HourRollup._meta.db_table)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            chunk = rows[start:start + UPSERT_CHUNK_SIZE]
+            params = []
+            for key, totals in chunk:
+                params.extend(key)
+                params.extend(totals)
+            values = ', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(chunk))
+            cursor.execute(ROLLUP_UPSERT_SQL.format(table=table, values=values), params)
+
+
+def record_shifts(shifts, sign=1):
+    """Add (``sign=1``) or remove (``sign=-1``) shifts given as ``SHIFT_FIELDS`` tuples"""
+    deltas = {}
+    for shift in shifts:
+        add_shift(deltas, shift, sign)
+    apply_deltas(deltas)
+
+
+def rebuild_hour_rollups():
+    """Recompute every rollup from the hours table, one grouped INSERT per scope and period"""
+    tables = {
+        'rollups': connection.ops.quote_name(HourRollup._meta.db_table),
+        'hours': connection.ops.quote_name(VolunteerHour._meta.db_table),
+        'opportunities': connection.ops.quote_name(Opportunity._meta.db_table),
+    }
+    with transaction.atomic(), connection.cursor() as cursor:
+        HourRollup.objects.all().delete()
+        for scope, subject in ROLLUP_SUBJECTS.items():
+            for period, period_start in ROLLUP_PERIOD_STARTS.items():
+                sql = ROLLUP_REBUILD_SQL.format(subject=subject, period_start=period_start, **tables)
+                params = [scope, period] + ([settings.TIME_ZONE] if '%s' in period_start else [])
+                cursor.execute(sql, params)
+        return HourRollup.objects.count()
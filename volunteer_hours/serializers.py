@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import VolunteerHour
+from .models import VolunteerHour, HourRollup
+from .overlaps import lock_volunteers, overlapping_hours
 
 class VolunteerHourSerializer(serializers.ModelSerializer):
     class Meta:
@@ -8,6 +9,40 @@ class VolunteerHourSerializer(serializers.ModelSerializer):
         read_only_fields = ('hours_volunteered', 'verified', 'verified_by', 'volunteer')
 
     def validate(self, data):
-        if data['start_time'] >= data['end_time']:
+        # Partial updates fall back to the stored times
+        start_time = data.get('start_time', getattr(self.instance, 'start_time', None))
+        end_time = data.get('end_time', getattr(self.instance, 'end_time', None))
+        if start_time >= end_time:
             raise serializers.ValidationError("End time must be after start time")
+
+        if self.instance is not None:
+            volunteer_id = self.instance.volunteer_id
+        elif 'request' in self.context:
+            volunteer_id = self.context['request'].user.id
+        else:
+            volunteer_id = getattr(data.get('volunteer'), 'id', None)
+        if volunteer_id is None:
+            return data
+        # Held until the caller's transaction ends; VolunteerHourViewSet keeps
+        # it open through the save so the checked interval stays free
+        lock_volunteers([volunteer_id])
+        clash = overlapping_hours(
+            volunteer_id, start_time, end_time, exclude_id=getattr(self.instance, 'id', None),
+        ).order_by('start_time').first()
+        if clash is not None:
+            raise serializers.ValidationError(
+                f"Overlaps hours {clash.id} logged from {clash.start_time.isoformat()} to {clash.end_time.isoformat()}"
+            )
         return data
+
+class HourRollupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = HourRollup
+        fields = ('period', 'period_start', 'total_hours', 'verified_hours', 'shift_count')
+
+class LeaderboardEntrySerializer(serializers.Serializer):
+    volunteer_id = serializers.IntegerField(source='subject_id')
+    volunteer = serializers.CharField(source='username')
+    total_hours = serializers.DecimalField(max_digits=12, decimal_places=2)
+    verified_hours = serializers.DecimalField(max_digits=12, decimal_places=2)
+    shift_count = serializers.IntegerField()
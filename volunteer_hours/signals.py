@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .models import VolunteerHour
+from .rollups import SHIFT_FIELDS, add_shift, apply_deltas, record_shifts, shift_of
+
+
+@receiver(pre_save, sender=VolunteerHour)
+def remember_previous_shift(sender, instance, **kwargs):
+    # Runs inside VolunteerHour.save's transaction; the lock makes concurrent
+    # edits of one shift take turns instead of both subtracting the same state
+    instance._previous_shift = None
+    if instance.pk is not None:
+        instance._previous_shift = (
+            VolunteerHour.objects.select_for_update(of=('self',)).filter(pk=instance.pk)
+            .values_list(*SHIFT_FIELDS).first()
+        )
+
+
+@receiver(post_save, sender=VolunteerHour)
+def update_hour_rollups(sender, instance, **kwargs):
+    # Move the shift's contribution from its previous state to the new one;
+    # saves that change nothing the rollups track cancel out and write nothing
+    deltas = {}
+    previous = getattr(instance, '_previous_shift', None)
+    if previous is not None:
+        add_shift(deltas, previous, -1)
+    add_shift(deltas, shift_of(instance))
+    apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=VolunteerHour)
+def remove_from_hour_rollups(sender, instance, **kwargs):
+    record_shifts([shift_of(instance)], sign=-1)
@@ -1,9 +1,26 @@
+import csv
+import io
 import pytest
 import json
+from concurrent.futures import ThreadPoolExecutor
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
-from datetime import datetime, timedelta
-from .models import VolunteerHour
+from rest_framework.exceptions import ValidationError
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from accounts.models import User
+from notifications.models import Notification
+from opportunities.models import Opportunity
+from .models import VolunteerHour, HourRollup
+from .importer import import_hours
+from .verification import set_verified
+from .rollups import rebuild_hour_rollups
+from .serializers import VolunteerHourSerializer
 from rest_framework.test import APIClient
 
 @pytest.mark.django_db
@@ -110,7 +127,7 @@ class TestVolunteerHours:
         # Then list hours
         response = vol_client.get(reverse('volunteerhour-list'))
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) > 0
+        assert len(response.data['results']) > 0
 
     def test_unauthorized_verify(self, vol_client, hour_data):
         """Test volunteer cannot verify hours"""
@@ -122,3 +139,468 @@ class TestVolunteerHours:
         verify_url = reverse('volunteerhour-verify', args=[hour_id])
         response = vol_client.post(verify_url)
         assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_overlapping_hours_are_rejected(self, vol_client, hour_data):
+        hour_id = vol_client.post(reverse('volunteerhour-list'), hour_data).data['id']
+        start = datetime.strptime(hour_data['end_time'], '%Y-%m-%dT%H:%M:%S.%fZ')
+
+        overlapping = dict(hour_data, end_time=(start + timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+                           start_time=(start - timedelta(minutes=30)).strftime('%Y-%m-%dT%H:%M:%S.%fZ'))
+        response = vol_client.post(reverse('volunteerhour-list'), overlapping)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert f'Overlaps hours {hour_id}' in response.data['non_field_errors'][0]
+
+        adjacent = dict(overlapping, start_time=hour_data['end_time'])
+        assert vol_client.post(reverse('volunteerhour-list'), adjacent).status_code == status.HTTP_201_CREATED
+        # Editing a shift does not clash with itself
+        response = vol_client.patch(reverse('volunteerhour-detail', args=[hour_id]), hour_data)
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+class TestHoursExport:
+    @pytest.fixture
+    def organization(self):
+        return User.objects.create_user(username='exportorg', password='x', is_organization=True)
+
+    @pytest.fixture
+    def hours(self, organization):
+        other_org = User.objects.create_user(username='otherorg', password='x', is_organization=True)
+        volunteer = User.objects.create_user(username='exportvol', password='x', is_volunteer=True)
+        opportunities = [
+            Opportunity.objects.create(
+                title=title, description='Test', organization=org, required_skills=[], location='Here',
+                start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1),
+            )
+            for title, org in (('Mine', organization), ('Also mine', organization), ('Theirs', other_org))
+        ]
+        day = timezone.make_aware(datetime(2025, 3, 1, 9))
+        for i, (opportunity, verified) in enumerate(
+            [(opportunities[0], True), (opportunities[0], False), (opportunities[1], True), (opportunities[2], True)]
+        ):
+            VolunteerHour.objects.create(
+                volunteer=volunteer, opportunity=opportunity, verified=verified, notes=f'shift, {i}',
+                start_time=day + timedelta(days=i), end_time=day + timedelta(days=i, hours=2),
+            )
+        return opportunities
+
+    def export(self, organization, **params):
+        client = APIClient()
+        client.force_authenticate(user=organization)
+        response = client.get(reverse('volunteerhour-export'), params)
+        assert response.status_code == status.HTTP_200_OK
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv_streams_own_hours(self, organization, hours):
+        response, content = self.export(organization)
+
+        assert response['Content-Type'] == 'text/csv'
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert [(row['opportunity'], row['notes']) for row in rows] == [
+            ('Mine', 'shift, 0'), ('Mine', 'shift, 1'), ('Also mine', 'shift, 2'),
+        ]
+        assert rows[0]['hours_volunteered'] == '2.00'
+
+    def test_ndjson_applies_filters(self, organization, hours):
+        response, content = self.export(
+            organization, output='ndjson', opportunity=hours[0].id, verified='true', **{'from': '2025-03-01', 'to': '2025-03-02'},
+        )
+
+        assert response['Content-Type'] == 'application/x-ndjson'
+        records = [json.loads(line) for line in content.splitlines()]
+        assert [(record['notes'], record['verified']) for record in records] == [('shift, 0', True)]
+
+    def test_invalid_filters_are_rejected(self, organization):
+        client = APIClient()
+        client.force_authenticate(user=organization)
+        assert client.get(reverse('volunteerhour-export'), {'from': 'March'}).status_code == status.HTTP_400_BAD_REQUEST
+        assert client.get(reverse('volunteerhour-export'), {'output': 'xml'}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_command_writes_file(self, organization, hours, tmp_path):
+        path = tmp_path / 'hours.ndjson'
+        call_command('export_hours', output='ndjson', file=str(path), organization='exportorg', verified='false')
+
+        assert [json.loads(line)['notes'] for line in path.read_text().splitlines()] == ['shift, 1']
+
+
+@pytest.mark.django_db
+class TestHourRollups:
+    @pytest.fixture
+    def organization(self):
+        return User.objects.create_user(username='rolluporg', password='x', is_organization=True)
+
+    @pytest.fixture
+    def opportunity(self, organization):
+        return Opportunity.objects.create(
+            title='Rollups', description='Test', organization=organization, required_skills=[], location='Here',
+            start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1),
+        )
+
+    def log(self, volunteer, opportunity, day, hours, verified=False):
+        start = timezone.make_aware(datetime(2025, 3, day, 9))
+        return VolunteerHour.objects.create(
+            volunteer=volunteer, opportunity=opportunity, verified=verified,
+            start_time=start, end_time=start + timedelta(hours=hours),
+        )
+
+    def totals(self, scope, subject_id, period='all'):
+        return list(
+            HourRollup.objects.filter(scope=scope, subject_id=subject_id, period=period)
+            .order_by('period_start').values_list('period_start', 'total_hours', 'verified_hours', 'shift_count')
+        )
+
+    def test_rollups_follow_saves_verification_and_deletes(self, organization, opportunity):
+        volunteer = User.objects.create_user(username='rollvol', password='x', is_volunteer=True)
+        # Monday 3 March and Monday 10 March 2025 start different weeks
+        first = self.log(volunteer, opportunity, 3, 2)
+        self.log(volunteer, opportunity, 10, 3)
+
+        first.verified = True
+        first.save()
+        assert self.totals('volunteer', volunteer.id) == [(date(1970, 1, 1), Decimal('5.00'), Decimal('2.00'), 2)]
+        assert self.totals('organization', organization.id, 'week') == [
+            (date(2025, 3, 3), Decimal('2.00'), Decimal('2.00'), 1),
+            (date(2025, 3, 10), Decimal('3.00'), Decimal('0.00'), 1),
+        ]
+
+        first.delete()
+        assert self.totals('opportunity', opportunity.id, 'month') == [
+            (date(2025, 3, 1), Decimal('3.00'), Decimal('0.00'), 1),
+        ]
+
+    def test_edits_lock_the_stored_shift(self, opportunity):
+        volunteer = User.objects.create_user(username='lockvol', password='x', is_volunteer=True)
+        hour = self.log(volunteer, opportunity, 3, 2)
+
+        with CaptureQueriesContext(connection) as queries:
+            hour.hours_volunteered = Decimal('3.00')
+            hour.save()
+        sql = [query['sql'] for query in queries]
+        locked = next(i for i, statement in enumerate(sql) if 'FOR UPDATE' in statement)
+        assert locked < next(i for i, statement in enumerate(sql) if statement.startswith('UPDATE'))
+        assert self.totals('volunteer', volunteer.id) == [(date(1970, 1, 1), Decimal('3.00'), Decimal('0.00'), 1)]
+
+    def test_rebuild_matches_incremental_totals(self, opportunity):
+        volunteer = User.objects.create_user(username='rollvol', password='x', is_volunteer=True)
+        for day, hours, verified in ((3, 2, True), (4, 1, False), (12, 4, True)):
+            self.log(volunteer, opportunity, day, hours, verified)
+        incremental = sorted(HourRollup.objects.values_list(
+            'scope', 'subject_id', 'period', 'period_start', 'total_hours', 'verified_hours', 'shift_count'))
+
+        rebuild_hour_rollups()
+
+        assert sorted(HourRollup.objects.values_list(
+            'scope', 'subject_id', 'period', 'period_start', 'total_hours', 'verified_hours', 'shift_count')) == incremental
+
+    def test_summary_and_leaderboard_endpoints(self, organization, opportunity):
+        volunteers = [User.objects.create_user(username=f'board{i}', password='x', is_volunteer=True) for i in range(3)]
+        for volunteer, hours in zip(volunteers, (1, 5, 3)):
+            self.log(volunteer, opportunity, 3, hours, verified=hours != 5)
+        client = APIClient()
+        client.force_authenticate(user=organization)
+
+        response = client.get(reverse('volunteerhour-leaderboard'), {'period': 'week', 'period_start': '2025-03-03'})
+        assert [(e['volunteer'], e['total_hours']) for e in response.data] == [
+            ('board1', '5.00'), ('board2', '3.00'), ('board0', '1.00'),
+        ]
+        response = client.get(reverse('volunteerhour-leaderboard'), {'metric': 'verified', 'limit': 1})
+        assert [e['volunteer'] for e in response.data] == ['board2']
+
+        response = client.get(reverse('volunteerhour-summary'), {'period': 'month'})
+        assert [(r['period_start'], r['total_hours'], r['shift_count']) for r in response.data] == [
+            ('2025-03-01', '9.00', 3),
+        ]
+        client.force_authenticate(user=volunteers[1])
+        assert client.get(reverse('volunteerhour-summary')).data[0]['verified_hours'] == '0.00'
+
+    def test_malformed_parameters_are_rejected(self, organization):
+        client = APIClient()
+        client.force_authenticate(user=organization)
+
+        response = client.get(reverse('volunteerhour-summary'), {'opportunity': 'abc'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'opportunity' in response.data
+        response = client.get(reverse('volunteerhour-leaderboard'), {'period_start': '2025-02-30'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'period_start' in response.data
+
+
+@pytest.mark.django_db
+class TestBulkVerification:
+    @pytest.fixture
+    def organization(self):
+        return User.objects.create_user(username='bulkorg', password='x', is_organization=True)
+
+    @pytest.fixture
+    def hours(self, organization):
+        other_org = User.objects.create_user(username='bulkother', password='x', is_organization=True)
+        mine, theirs = [
+            Opportunity.objects.create(
+                title=title, description='Test', organization=org, required_skills=[], location='Here',
+                start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1),
+            )
+            for title, org in (('Cleanup', organization), ('Elsewhere', other_org))
+        ]
+        hours = []
+        for i in range(4):
+            volunteer = User.objects.create_user(username=f'bulkvol{i}', password='x', is_volunteer=True)
+            for opportunity in (mine, theirs):
+                start = timezone.make_aware(datetime(2025, 3, 1 + i, 9))
+                hours.append(VolunteerHour.objects.create(
+                    volunteer=volunteer, opportunity=opportunity, start_time=start, end_time=start + timedelta(hours=2),
+                ))
+        return mine, theirs
+
+    @pytest.fixture
+    def client(self, organization):
+        client = APIClient()
+        client.force_authenticate(user=organization)
+        return client
+
+    def test_bulk_verify_by_filters_in_one_update(self, settings, client, hours, django_capture_on_commit_callbacks):
+        settings.JOBS_BACKEND = 'immediate'
+        mine, theirs = hours
+
+        with django_capture_on_commit_callbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            response = client.post(reverse('volunteerhour-bulk-verify'),
+                                   {'opportunity': mine.id, 'from': '2025-03-02', 'to': '2025-03-03'}, format='json')
+
+        assert response.data == {'status': 'hours verified', 'updated': 2}
+        assert len([q for q in queries if q['sql'].lstrip().startswith('UPDATE')]) == 1
+        assert sorted(VolunteerHour.objects.filter(verified=True).values_list('volunteer__username', flat=True)) == [
+            'bulkvol1', 'bulkvol2',
+        ]
+        assert Notification.objects.filter(notification_type='hours').count() == 2
+        assert HourRollup.objects.get(scope='opportunity', subject_id=mine.id, period='all').verified_hours == 4
+
+    def test_bulk_actions_only_touch_own_hours(self, client, hours):
+        mine, theirs = hours
+        all_ids = list(VolunteerHour.objects.values_list('id', flat=True))
+
+        response = client.post(reverse('volunteerhour-bulk-verify'), {'ids': all_ids}, format='json')
+        assert response.data['updated'] == 4
+        assert not VolunteerHour.objects.filter(opportunity=theirs, verified=True).exists()
+
+        response = client.post(reverse('volunteerhour-bulk-unverify'), {'ids': all_ids[:2]}, format='json')
+        assert response.data == {'status': 'hours unverified', 'updated': 1}
+        assert HourRollup.objects.get(scope='opportunity', subject_id=mine.id, period='all').verified_hours == 6
+
+    def test_bulk_selection_is_required(self, client, hours):
+        assert client.post(reverse('volunteerhour-bulk-verify'), {}, format='json').status_code == 400
+        assert client.post(reverse('volunteerhour-bulk-verify'), {'ids': 'all'}, format='json').status_code == 400
+
+
+@pytest.mark.django_db
+class TestHoursImport:
+    @pytest.fixture
+    def organization(self):
+        return User.objects.create_user(username='importorg', password='x', is_organization=True)
+
+    @pytest.fixture
+    def opportunities(self, organization):
+        other_org = User.objects.create_user(username='importother', password='x', is_organization=True)
+        return [
+            Opportunity.objects.create(
+                title=title, description='Test', organization=org, required_skills=[], location='Here',
+                start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1),
+            )
+            for title, org in (('Mine', organization), ('Theirs', other_org))
+        ]
+
+    @pytest.fixture
+    def volunteer(self, opportunities):
+        volunteer = User.objects.create_user(username='importvol', password='x', is_volunteer=True)
+        # Already on record: 2025-03-01 09:00-11:00
+        start = timezone.make_aware(datetime(2025, 3, 1, 9))
+        VolunteerHour.objects.create(
+            volunteer=volunteer, opportunity=opportunities[0], start_time=start, end_time=start + timedelta(hours=2),
+        )
+        return volunteer
+
+    def test_csv_upload_reports_rejected_rows(self, organization, opportunities, volunteer):
+        mine, theirs = opportunities
+        content = '\n'.join([
+            'volunteer,opportunity_id,start_time,end_time,notes',
+            f'importvol,{mine.id},2025-03-01T11:00:00,2025-03-01T13:30:00,after the stored shift',
+            f'importvol,{mine.id},2025-03-01T10:00:00,2025-03-01T10:30:00,overlaps stored',
+            f'importvol,{mine.id},2025-03-01T13:00:00,2025-03-01T14:00:00,overlaps row 1',
+            f'importvol,{theirs.id},2025-03-02T09:00:00,2025-03-02T10:00:00,not ours',
+            f'nobody,{mine.id},2025-03-02T09:00:00,2025-03-02T09:00:00,',
+            f'importvol,{mine.id},2025-03-02T09:00:00,2025-03-02T10:15:00,',
+        ])
+        client = APIClient()
+        client.force_authenticate(user=organization)
+
+        response = client.post(
+            reverse('volunteerhour-import-hours'),
+            {'file': SimpleUploadedFile('hours.csv', content.encode(), content_type='text/csv')},
+            format='multipart',
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['created'] == 2
+        assert response.data['failed'] == 4
+        errors = {error['row']: error['errors'] for error in response.data['errors']}
+        assert errors[3] == ['Overlaps row 1']
+        assert errors[2][0].startswith('Overlaps hours')
+        assert errors[4] == ['Unknown opportunity, or not one of yours']
+        assert errors[5] == ['End time must be after start time']
+        assert sorted(VolunteerHour.objects.values_list('hours_volunteered', flat=True)) == [
+            Decimal('1.25'), Decimal('2.00'), Decimal('2.50'),
+        ]
+        rollup = HourRollup.objects.get(scope='opportunity', subject_id=mine.id, period='all')
+        assert (rollup.total_hours, rollup.shift_count) == (Decimal('5.75'), 3)
+
+    def test_overlong_shifts_and_bad_encoding_are_reported(self, organization, opportunities, volunteer):
+        mine, _ = opportunities
+        header = b'volunteer,opportunity_id,start_time,end_time,notes\n'
+        rows = [
+            f'importvol,{mine.id},2025-05-01T09:00:00,2025-06-12T16:00:00,\n'.encode(),  # 1015 hours
+            f'importvol,{mine.id},2025-02-30T09:00:00,2025-02-30T12:00:00,\n'.encode(),
+            f'importvol,{mine.id},2025-07-01T09:00:00,2025-07-01T12:00:00,\n'.encode(),
+            # Long enough that the bad bytes are only decoded after the rows above are saved
+            f'importvol,{mine.id},2025-07-03T09:00:00,2025-07-03T12:00:00,{"x" * 20000}\n'.encode(),
+            b'importvol,\xff\xfe,2025-07-02T09:00:00,2025-07-02T12:00:00,\n',
+        ]
+        lines = io.TextIOWrapper(io.BytesIO(header + b''.join(rows)), encoding='utf-8', newline='')
+
+        report = import_hours(organization, lines, batch_size=1)
+
+        assert report['created'] == 1
+        assert report['errors'] == [
+            {'row': 1, 'errors': ['Shifts must be at most 999.99 hours']},
+            {'row': 2, 'errors': [
+                'start_time must be an ISO 8601 date and time', 'end_time must be an ISO 8601 date and time',
+            ]},
+        ]
+        assert report['error'] == 'Not valid UTF-8 text; stopped after 3 rows'
+
+    def test_volunteers_cannot_import(self, volunteer):
+        client = APIClient()
+        client.force_authenticate(user=volunteer)
+        upload = SimpleUploadedFile('hours.csv', b'volunteer,opportunity_id,start_time,end_time\n')
+        response = client.post(reverse('volunteerhour-import-hours'), {'file': upload}, format='multipart')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_command_imports_ndjson_in_batches(self, organization, opportunities, volunteer, tmp_path):
+        mine, _ = opportunities
+        path = tmp_path / 'hours.ndjson'
+        day = datetime(2025, 4, 1, 9)
+        path.write_text(''.join(
+            json.dumps({
+                'volunteer_id': volunteer.id, 'opportunity_id': mine.id,
+                'start_time': (day + timedelta(hours=i)).isoformat(), 'end_time': (day + timedelta(hours=i + 1)).isoformat(),
+            }) + '\n'
+            for i in [0, 1, 2, 2, 3]
+        ) + 'not json\n')
+        out = io.StringIO()
+
+        call_command('import_hours', str(path), organization='importorg', input='ndjson', batch_size=2, stdout=out)
+
+        assert out.getvalue().strip() == 'Imported 4 hours, rejected 2 rows'
+        assert VolunteerHour.objects.filter(volunteer=volunteer).count() == 5
+
+
+@pytest.mark.django_db
+class TestHourOverlapAudit:
+    def test_command_reports_each_overlapping_pair(self):
+        organization = User.objects.create_user(username='auditorg', password='x', is_organization=True)
+        opportunity = Opportunity.objects.create(
+            title='Audit', description='Test', organization=organization, required_skills=[], location='Here',
+            start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1),
+        )
+        day = timezone.make_aware(datetime(2025, 5, 1, 9))
+        hours = {}
+        # Shifts written straight to the table, as before the overlap check existed
+        for username, start, length in [
+            ('auditvol', 0, 4), ('auditvol', 1, 1), ('auditvol', 3, 2), ('auditvol', 5, 1), ('auditother', 0, 4),
+        ]:
+            volunteer, _ = User.objects.get_or_create(username=username, defaults={'is_volunteer': True})
+            hours[(username, start)] = VolunteerHour.objects.create(
+                volunteer=volunteer, opportunity=opportunity,
+                start_time=day + timedelta(hours=start), end_time=day + timedelta(hours=start + length),
+            ).id
+        out = io.StringIO()
+
+        call_command('audit_hour_overlaps', chunk_size=2, stdout=out)
+
+        volunteer_id = User.objects.get(username='auditvol').id
+        assert out.getvalue().splitlines() == [
+            f"volunteer {volunteer_id}: hours {hours[('auditvol', 0)]} overlaps hours {hours[('auditvol', 1)]}",
+            f"volunteer {volunteer_id}: hours {hours[('auditvol', 0)]} overlaps hours {hours[('auditvol', 3)]}",
+            "Found 2 overlapping pairs",
+        ]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentHours:
+    def test_concurrent_overlapping_submissions_save_one_shift(self):
+        organization = User.objects.create_user(username='raceorg', password='x', is_organization=True)
+        volunteer = User.objects.create_user(username='racevol', password='x', is_volunteer=True)
+        opportunity = Opportunity.objects.create(
+            title='Race', description='Test', organization=organization, required_skills=[], location='Here',
+            start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1),
+        )
+        start = timezone.make_aware(datetime(2025, 8, 1, 9))
+
+        def submit(offset):
+            client = APIClient()
+            client.force_authenticate(user=volunteer)
+            try:
+                return client.post(reverse('volunteerhour-list'), {
+                    'opportunity': opportunity.id,
+                    'start_time': (start + timedelta(minutes=offset)).isoformat(),
+                    'end_time': (start + timedelta(minutes=offset, hours=2)).isoformat(),
+                }).status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            outcomes = list(pool.map(submit, range(8)))
+
+        assert outcomes.count(status.HTTP_201_CREATED) == 1
+        assert VolunteerHour.objects.filter(volunteer=volunteer).count() == 1
+
+    def test_concurrent_verifies_count_a_shift_once(self):
+        organization = User.objects.create_user(username='verifyorg', password='x', is_organization=True)
+        volunteer = User.objects.create_user(username='verifyvol', password='x', is_volunteer=True)
+        opportunity = Opportunity.objects.create(
+            title='Twice', description='Test', organization=organization, required_skills=[], location='Here',
+            start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1),
+        )
+        start = timezone.make_aware(datetime(2025, 8, 3, 9))
+        hour = VolunteerHour.objects.create(volunteer=volunteer, opportunity=opportunity, start_time=start,
+                                            end_time=start + timedelta(hours=2))
+
+        def verify(_):
+            try:
+                return set_verified(organization, True, ids=[hour.id])
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            updated = [hour_id for ids in pool.map(verify, range(8)) for hour_id in ids]
+
+        assert updated == [hour.id]
+        rollup = HourRollup.objects.get(scope='volunteer', subject_id=volunteer.id, period='all')
+        assert rollup.verified_hours == Decimal('2.00')
+
+    def test_serializer_without_request_uses_the_given_volunteer(self):
+        organization = User.objects.create_user(username='ctxorg', password='x', is_organization=True)
+        volunteer = User.objects.create_user(username='ctxvol', password='x', is_volunteer=True)
+        opportunity = Opportunity.objects.create(
+            title='Context', description='Test', organization=organization, required_skills=[], location='Here',
+            start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1),
+        )
+        start = timezone.make_aware(datetime(2025, 8, 2, 9))
+        VolunteerHour.objects.create(volunteer=volunteer, opportunity=opportunity, start_time=start,
+                                     end_time=start + timedelta(hours=2))
+
+        serializer = VolunteerHourSerializer(data={
+            'opportunity': opportunity.id, 'start_time': start.isoformat(),
+            'end_time': (start + timedelta(hours=1)).isoformat(),
+        })
+        # No request in the context and no volunteer: nothing to check against
+        assert serializer.is_valid(), serializer.errors
+        with pytest.raises(ValidationError, match='Overlaps hours'):
+            VolunteerHourSerializer().validate({**serializer.validated_data, 'volunteer': volunteer})
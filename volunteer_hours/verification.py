@@ -0,0 +1,67 @@
+from django.db import connection, transaction
+from jobs.queue import enqueue
+from opportunities.models import Opportunity
+from .models import VolunteerHour
+from .rollups import add_shift, apply_deltas
+
+# Flips ``verified`` on the selected hours and returns what the rollups and
+# notifications need; the selection subquery carries the ownership check
+SET_VERIFIED_SQL = """
+UPDATE {hours} AS h SET verified = %s, verified_by_id = %s
+FROM {opportunities} AS o
+WHERE o.id = h.opportunity_id AND h.id IN ({selection}) AND h.verified IS DISTINCT FROM %s
+RETURNING h.id, h.volunteer_id, h.opportunity_id, o.organization_id, h.start_time, h.hours_volunteered, o.title
+"""
+
+
+def set_verified(organization, verified, lookups=None, ids=None):
+    """
+    Mark hours of ``organization``'s opportunities as verified (or not) with
+    a single ``UPDATE``.
+
+    Hours are selected by ``lookups`` (queryset filters) and/or ``ids``;
+    hours of other organizations and hours already in the target state are
+    never touched. The rollups are adjusted and the affected volunteers
+    notified with one bulk insert. Returns the ids of the updated hours.
+    """
+    selection = VolunteerHour.objects.filter(opportunity__organization=organization, **(lookups or {}))
+    if ids is not None:
+        selection = selection.filter(id__in=ids)
+    selection = selection.exclude(verified=verified).values('id')
+    subquery, params = selection.query.sql_with_params()
+    sql = SET_VERIFIED_SQL.format(
+        hours=connection.ops.quote_name(VolunteerHour._meta.db_table),
+        opportunities=connection.ops.quote_name(Opportunity._meta.db_table),
+        selection=subquery,
+    )
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # The state is checked again on the locked row: the selection's
+            # snapshot predates any concurrent verify we waited for
+            cursor.execute(sql, [verified, organization.id if verified else None, *params, verified])
+            updated = cursor.fetchall()
+
+        # Only verified_hours changes: move each shift from the old state to the new one
+        deltas = {}
+        for _, volunteer_id, opportunity_id, organization_id, start_time, hours, _ in updated:
+            shift = (volunteer_id, opportunity_id, organization_id, start_time, hours)
+            add_shift(deltas, (*shift, not verified), -1)
+            add_shift(deltas, (*shift, verified))
+        apply_deltas(deltas)
+
+        if updated:
+            state = 'verified' if verified else 'marked as unverified'
+            enqueue(
+                'notifications.utils.bulk_create_individual_notifications',
+                notifications=[
+                    {
+                        'user_id': volunteer_id,
+                        'notification_type': 'hours',
+                        'message': f"Your volunteer hours for {title} have been {state}",
+                        'related_object_id': hour_id,
+                    }
+                    for hour_id, volunteer_id, _, _, _, _, title in updated
+                ],
+            )
+    return [row[0] for row in updated]
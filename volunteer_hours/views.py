@@ -1,22 +1,63 @@
+import io
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from .models import VolunteerHour
-from .serializers import VolunteerHourSerializer
+from .export import EXPORT_FORMATS, export_filters
+from .importer import IMPORT_FORMATS, import_hours
+from .models import VolunteerHour, HourRollup
+from .rollups import current_period_start
+from .verification import set_verified
+from .serializers import VolunteerHourSerializer, HourRollupSerializer, LeaderboardEntrySerializer
+from accounts.models import User
+from opportunities.models import Opportunity
 from accounts.permissions import IsOrganization
-from notifications.utils import create_notification
+from django.utils.dateparse import parse_date
+from volunteer_bridge.query_planning import QueryPlanMixin
 
-class VolunteerHourViewSet(viewsets.ModelViewSet):
+PERIODS = [period for period, _ in HourRollup.PERIOD_CHOICES]
+SUMMARY_MAX_PERIODS = 104
+LEADERBOARD_DEFAULT_LIMIT = 10
+LEADERBOARD_MAX_LIMIT = 100
+# Filters accepted by the bulk verification actions
+BULK_FILTERS = ('opportunity', 'from', 'to')
+
+def _period_param(request):
+    period = request.query_params.get('period', 'all')
+    if period not in PERIODS:
+        raise ValidationError({'period': f"Must be one of: {', '.join(PERIODS)}"})
+    return period
+
+def _limit_param(request, default, maximum):
+    try:
+        return min(max(int(request.query_params.get('limit', default)), 1), maximum)
+    except ValueError:
+        raise ValidationError({'limit': "Must be an integer"})
+
+class VolunteerHourViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     queryset = VolunteerHour.objects.all()
     serializer_class = VolunteerHourSerializer
+    ordering = '-start_time'
 
     def get_permissions(self):
-        if self.action in ['verify', 'unverify']:
+        if self.action in ['verify', 'unverify', 'bulk_verify', 'bulk_unverify', 'import_hours']:
             permission_classes = [IsOrganization]
         else:
             permission_classes = [permissions.IsAuthenticated]
         return [permission() for permission in permission_classes]
 
+    def create(self, request, *args, **kwargs):
+        # Validation locks the volunteer's hours for the overlap check; keep
+        # the lock until the new shift is saved
+        with transaction.atomic():
+            return super().create(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().update(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         serializer.save(volunteer=self.request.user)
 
@@ -26,29 +67,141 @@ class VolunteerHourViewSet(viewsets.ModelViewSet):
             return VolunteerHour.objects.filter(opportunity__organization=user)
         return VolunteerHour.objects.filter(volunteer=user)
 
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['POST'])
     def verify(self, request, pk=None):
         hour = self.get_object()
-        hour.verified = True
-        hour.verified_by = request.user
-        hour.save()
-        serializer = self.get_serializer(hour)
+        set_verified(request.user, True, ids=[hour.id])
         return Response({'status': 'hours verified'})
-    
+
     @action(detail=True, methods=['POST'])
-    def verify(self, request, pk=None):
+    def unverify(self, request, pk=None):
         hour = self.get_object()
-        hour.verified = True
-        hour.verified_by = request.user
-        hour.save()
-        
-        # Notify volunteer that hours were verified
-        create_notification(
-            user=hour.volunteer,
-            notification_type='hours',
-            message=f"Your volunteer hours for {hour.opportunity.title} have been verified",
-            related_object_id=hour.id
+        set_verified(request.user, False, ids=[hour.id])
+        return Response({'status': 'hours unverified'})
+
+    @action(detail=False, methods=['POST'])
+    def bulk_verify(self, request):
+        """
+        Verify many hours at once. The body selects them with ``ids`` and/or
+        the ``opportunity``, ``from`` and ``to`` filters of the export.
+        """
+        updated = set_verified(request.user, True, **self._bulk_selection(request))
+        return Response({'status': 'hours verified', 'updated': len(updated)})
+
+    @action(detail=False, methods=['POST'])
+    def bulk_unverify(self, request):
+        """Undo the verification of many hours, selected like ``bulk_verify``"""
+        updated = set_verified(request.user, False, **self._bulk_selection(request))
+        return Response({'status': 'hours unverified', 'updated': len(updated)})
+
+    def _bulk_selection(self, request):
+        ids = request.data.get('ids')
+        if ids is not None and (
+            not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)
+        ):
+            raise ValidationError({'ids': "Must be a list of ids"})
+        try:
+            lookups = export_filters({name: request.data.get(name) for name in BULK_FILTERS})
+        except ValueError as e:
+            raise ValidationError({'detail': str(e)})
+        if ids is None and not lookups:
+            raise ValidationError({'detail': "Select hours with ids or filters"})
+        return {'ids': ids, 'lookups': lookups}
+
+    @action(detail=False, methods=['GET'])
+    def export(self, request):
+        """Stream the visible hours as CSV or NDJSON (``?output=csv|ndjson``)"""
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({'output': f"Must be one of: {', '.join(EXPORT_FORMATS)}"})
+        try:
+            lookups = export_filters(request.query_params)
+        except ValueError as e:
+            raise ValidationError({'detail': str(e)})
+
+        lines, content_type = EXPORT_FORMATS[output]
+        response = StreamingHttpResponse(lines(self.get_queryset().filter(**lookups)), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="volunteer-hours.{output}"'
+        return response
+
+    @action(detail=False, methods=['POST'], url_path='import')
+    def import_hours(self, request):
+        """
+        Import hours for the organization's opportunities from an uploaded
+        ``file`` (``?input=csv|ndjson``, in the export's columns). Valid rows
+        are saved; the response reports the rows that were rejected and why,
+        and an ``error`` if the file stopped being readable part way.
+        """
+        input_format = request.query_params.get('input', 'csv')
+        if input_format not in IMPORT_FORMATS:
+            raise ValidationError({'input': f"Must be one of: {', '.join(IMPORT_FORMATS)}"})
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': "Upload the hours as a file"})
+
+        # Decoded line by line as the importer reads; the upload is never read whole
+        lines = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        report = import_hours(request.user, lines, input_format)
+        if report['created']:
+            response_status = status.HTTP_201_CREATED
+        elif 'error' in report:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_200_OK
+        return Response(report, status=response_status)
+
+    @action(detail=False, methods=['GET'])
+    def summary(self, request):
+        """
+        Hour totals of the current user per period (``?period=all|week|month``),
+        newest first. Organizations can pass ``?opportunity=<id>`` for one of
+        their opportunities.
+        """
+        period = _period_param(request)
+        user = request.user
+        scope, subject_id = ('organization', user.id) if user.is_organization else ('volunteer', user.id)
+        if user.is_organization and request.query_params.get('opportunity'):
+            try:
+                opportunity_id = int(request.query_params['opportunity'])
+            except ValueError:
+                raise ValidationError({'opportunity': "Must be an id"})
+            if not Opportunity.objects.filter(id=opportunity_id, organization=user).exists():
+                return Response({"detail": "Opportunity not found"}, status=status.HTTP_404_NOT_FOUND)
+            scope, subject_id = 'opportunity', opportunity_id
+
+        rollups = HourRollup.objects.filter(scope=scope, subject_id=subject_id, period=period).order_by('-period_start')
+        limit = _limit_param(request, SUMMARY_MAX_PERIODS, SUMMARY_MAX_PERIODS)
+        return Response(HourRollupSerializer(rollups[:limit], many=True).data)
+
+    @action(detail=False, methods=['GET'])
+    def leaderboard(self, request):
+        """
+        Volunteers with the most hours in one period: ``?period=all|week|month``,
+        ``?period_start=YYYY-MM-DD`` (default: the current period) and
+        ``?metric=total|verified``.
+        """
+        period = _period_param(request)
+        if 'period_start' in request.query_params:
+            try:
+                period_start = parse_date(request.query_params['period_start'])
+            except ValueError:
+                # Well formed but impossible, e.g. 2025-02-30
+                period_start = None
+            if period_start is None:
+                raise ValidationError({'period_start': "Expected a YYYY-MM-DD date"})
+        else:
+            period_start = current_period_start(period)
+        metric = request.query_params.get('metric', 'total')
+        if metric not in ('total', 'verified'):
+            raise ValidationError({'metric': "Must be total or verified"})
+        limit = _limit_param(request, LEADERBOARD_DEFAULT_LIMIT, LEADERBOARD_MAX_LIMIT)
+
+        field = f'{metric}_hours'
+        entries = list(
+            HourRollup.objects.filter(scope='volunteer', period=period, period_start=period_start, **{f'{field}__gt': 0})
+            .order_by(f'-{field}', 'subject_id')[:limit]
         )
-        
-        serializer = self.get_serializer(hour)
-        return Response(serializer.data)
+        usernames = dict(User.objects.filter(id__in=[e.subject_id for e in entries]).values_list('id', 'username'))
+        for entry in entries:
+            entry.username = usernames.get(entry.subject_id, '')
+        return Response(LeaderboardEntrySerializer(entries, many=True).data)